@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from pathlib import Path
@@ -6,13 +7,19 @@ from pathlib import Path
 
 DATA_DIR = Path(os.environ.get("MOVIELENS_DATA_DIR", ".")) 
 
-def load_ratings(sample_file: str = "sampled_data.csv"):
+def load_ratings(sample_file: str = "sampled_data.csv", columns=None, dtype=None):
     """
-    Load ratings dataframe from the sampled CSV file.
-
+    Load ratings dataframe from the sampled CSV file, or from a columnar
+    .npz sample written by sample_ratings.py. An absolute sample_file (such
+    as the training scripts' DATA_PATH) is used as is. columns / dtype
+    optionally restrict and cast the columns read.
     """
     file_path = DATA_DIR / sample_file
-    df = pd.read_csv(file_path)
+    if file_path.suffix == ".npz":
+        with np.load(file_path) as sample:
+            df = pd.DataFrame({c: sample[c] for c in (columns or sample.files)})
+        return df.astype(dtype) if dtype else df
+    df = pd.read_csv(file_path, usecols=columns, dtype=dtype)
     return df
 
 
@@ -0,0 +1,138 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+
+# -------------------------------
+# PATH LOGIC
+# -------------------------------
+# DATA_PATH names the training sample file elsewhere, so it is not used here
+PROJECT_ROOT = os.getenv("GITHUB_WORKSPACE")
+if not PROJECT_ROOT:
+    PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "Data")
+
+COLUMNS = ["userId", "movieId", "rating", "timestamp"]
+DTYPES = {"userId": np.int32, "movieId": np.int32, "rating": np.float32, "timestamp": np.int64}
+CHUNK_SIZE = 1_000_000
+
+
+def read_chunks(path, start=None, end=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream ratings.csv as dicts of column arrays, optionally keeping only
+    ratings with start <= timestamp < end (unix seconds).
+    """
+    for chunk in pd.read_csv(path, usecols=COLUMNS, dtype=DTYPES, chunksize=chunk_size):
+        cols = {c: chunk[c].values for c in COLUMNS}
+        if start is not None or end is not None:
+            keep = np.ones(len(chunk), dtype=bool)
+            if start is not None:
+                keep &= cols["timestamp"] >= start
+            if end is not None:
+                keep &= cols["timestamp"] < end
+            cols = {c: v[keep] for c, v in cols.items()}
+        yield cols
+
+
+def reservoir_sample(chunks, n, seed=42):
+    """
+    Uniform sample of exactly n rows (or all rows if fewer) in one pass,
+    holding only the n-row reservoir in memory (Algorithm R, chunked).
+    """
+    rng = np.random.default_rng(seed)
+    reservoir = {c: np.empty(n, dtype=DTYPES[c]) for c in COLUMNS}
+    seen = 0
+
+    for cols in chunks:
+        size = len(cols["userId"])
+        positions = seen + np.arange(size)
+
+        fill = positions < n
+        for c in COLUMNS:
+            reservoir[c][positions[fill]] = cols[c][fill]
+
+        # Row at stream position i replaces slot j ~ U[0, i] when j < n
+        rest = np.flatnonzero(~fill)
+        if len(rest):
+            slots = rng.integers(0, positions[rest] + 1)
+            hit = slots < n
+            src, dst = rest[hit], slots[hit]
+            # Several rows of a chunk can hit the same slot; the last one wins
+            _, last = np.unique(dst[::-1], return_index=True)
+            src, dst = src[::-1][last], dst[::-1][last]
+            for c in COLUMNS:
+                reservoir[c][dst] = cols[c][src]
+        seen += size
+
+    return {c: v[:min(seen, n)] for c, v in reservoir.items()}
+
+
+def _user_hash(user_ids, seed):
+    """
+    Seeded splitmix64 of each user id, mapped to [0, 1).
+    """
+    with np.errstate(over="ignore"):
+        z = user_ids.astype(np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def user_sample(chunks, fraction, seed=42):
+    """
+    Keep every rating of a seeded fraction of users, so collaborative models
+    see complete user histories. Users are picked by hashing their id, which
+    needs no state across chunks.
+    """
+    parts = {c: [] for c in COLUMNS}
+    for cols in chunks:
+        keep = _user_hash(cols["userId"], seed) < fraction
+        for c in COLUMNS:
+            parts[c].append(cols[c][keep])
+    return {c: np.concatenate(v) if v else np.array([], dtype=DTYPES[c]) for c, v in parts.items()}
+
+
+def save_sample(sample, output_path):
+    """
+    Write the sample as compressed columnar .npz (one typed array per column)
+    or, for a .csv path, in the same layout as sampled_data.csv. Both can be
+    passed to the training scripts as DATA_PATH.
+    """
+    if output_path.endswith(".csv"):
+        pd.DataFrame(sample)[COLUMNS].to_csv(output_path, index=False)
+    else:
+        np.savez_compressed(output_path, **sample)
+
+
+def _to_unix(date):
+    return int(pd.Timestamp(date).timestamp()) if date else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a training sample from the full ratings.csv in one pass.")
+    parser.add_argument("--input", default=os.path.join(DATA_DIR, "ratings.csv"))
+    parser.add_argument("--output", default=os.path.join(DATA_DIR, "sampled_ratings.npz"),
+                        help="Columnar .npz, or .csv for the sampled_data.csv layout")
+    parser.add_argument("--mode", choices=["reservoir", "users"], default="reservoir")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows to keep (reservoir mode)")
+    parser.add_argument("--user-fraction", type=float, default=0.01, help="Share of users to keep (users mode)")
+    parser.add_argument("--start", help="Keep ratings on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Keep ratings before this date (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print("Input path:", args.input)
+    print("Output path:", args.output)
+
+    chunks = read_chunks(args.input, start=_to_unix(args.start), end=_to_unix(args.end))
+    if args.mode == "reservoir":
+        sample = reservoir_sample(chunks, args.rows, seed=args.seed)
+    else:
+        sample = user_sample(chunks, args.user_fraction, seed=args.seed)
+
+    save_sample(sample, args.output)
+    print(f"Saved {len(sample['userId'])} ratings from {len(np.unique(sample['userId']))} users")
+    print(f"Train on it with DATA_PATH={args.output}")
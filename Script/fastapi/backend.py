@@ -1,14 +1,27 @@
 import os
+import json
+import base64
 import pickle
 import requests
 import pandas as pd
 import numpy as np
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from contextlib import asynccontextmanager
-from pydantic import BaseModel
+from typing import List
+from pydantic import BaseModel, Field
+from Script.models.metadata_store import MovieMetadataStore, STORE_DIRNAME
+from Script.models.factors import CFFactors, FACTORS_DIRNAME, training_ratings_path
+from Script.data.load_data import load_ratings
+from Script.models.rating_index import UserRatingIndex, INDEX_DIRNAME
+from Script.models.content_index import SIMILARITY_DIRNAME
+from Script.fastapi.scoring import HybridScorer, load_scorer, top_similar
+from Script.fastapi.executor import ScoringExecutor, Overloaded, ScoringTimeout
+from Script.fastapi.scheduler import MicroBatcher, SingleFlight
+from Script.fastapi.sharding import shard_for, shard_user_state
+from Script.fastapi.profiling import ProfileStore, ProfilingMiddleware, profiled, profiling_enabled
 
 # --- SMART PATH LOGIC ---
 # Get the absolute path of the directory where backend.py is located (Script/fastapi)
@@ -35,21 +48,36 @@ print(f"---------------------------")
 # Initialize globals
 similarity_matrix = None
 movie_index_map = None
-movie_metadata = {}
+movie_metadata = MovieMetadataStore.from_dict({})
 collaborative_model = None
+rating_index = None
+scorer = None
+scoring_executor = None
 ALL_MOVIES = []
+MOVIE_IDS_BY_ROW = []
 sampled_df = pd.DataFrame()
 ratings_df = pd.DataFrame()
 movies_df = pd.DataFrame()
 
+# --- SHARDING ---
+# With SHARD_COUNT > 1 this process only holds user state (user factors,
+# rating index) for users with shard_for(user_id) == SHARD_ID; item-side
+# artifacts stay whole. Script/fastapi/router.py routes users to their shard.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "1"))
+SHARD_ID = int(os.getenv("SHARD_ID", "0"))
+SHARDED = SHARD_COUNT > 1
+
 # Load dataframes once at startup
 try:
-    csv_path = os.path.join(DATA_DIR, "sampled_data.csv")
-    sampled_df = pd.read_csv(csv_path)
-    # Ensure ratings.csv and movies.csv are available for Admin Stats
-    ratings_path = os.path.join(DATA_DIR, "ratings.csv")
+    if not SHARDED:
+        # Whole-user-base frames; shards answer from their own rating index instead
+        # Ensure ratings.csv and movies.csv are available for Admin Stats
+        ratings_path = os.path.join(DATA_DIR, "ratings.csv")
+        ratings_df = pd.read_csv(ratings_path)
+        # The ratings the served factors were trained on (DATA_PATH or the trainer's default)
+        training_path = training_ratings_path(DATA_DIR)
+        sampled_df = ratings_df if training_path == ratings_path else load_ratings(training_path)
     movies_path = os.path.join(DATA_DIR, "movies.csv")
-    ratings_df = pd.read_csv(ratings_path)
     movies_df = pd.read_csv(movies_path)
 except Exception as e:
     print(f"CRITICAL: Could not load CSV data: {e}")
@@ -61,7 +89,8 @@ USERS = {
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global similarity_matrix, movie_index_map, movie_metadata, collaborative_model, ALL_MOVIES
+    global similarity_matrix, movie_index_map, movie_metadata, collaborative_model, rating_index, scorer, scoring_executor
+    global ALL_MOVIES, MOVIE_IDS_BY_ROW
     
     def load_pickle(name):
         path = os.path.join(MODEL_DIR, name)
@@ -73,16 +102,93 @@ async def lifespan(app: FastAPI):
                 print(f"ERROR: {name}: {e}")
         return None
 
-    collaborative_model = load_pickle("hybrid_cf_model.pkl") or load_pickle("trained_collaborative_model.pkl")
+    def load_metadata_store():
+        path = os.path.join(MODEL_DIR, STORE_DIRNAME)
+        if os.path.isdir(path):
+            try:
+                return MovieMetadataStore.load(path, mmap=True)
+            except Exception as e:
+                print(f"ERROR: {STORE_DIRNAME}: {e}")
+        return None
+
+    def load_factors():
+        # The export picked by CF_FACTORS (svd | als) wins over the surprise model's
+        path = os.path.join(MODEL_DIR, FACTORS_DIRNAME)
+        if os.path.isdir(path):
+            try:
+                return CFFactors.load(path, mmap=True)
+            except Exception as e:
+                print(f"ERROR: {FACTORS_DIRNAME}: {e}")
+        else:
+            print(f"WARNING: {FACTORS_DIRNAME} not found, serving the surprise model's factors")
+        if collaborative_model is not None:
+            return CFFactors.from_surprise(collaborative_model)
+        return None
+
+    def load_rating_index():
+        path = os.path.join(MODEL_DIR, INDEX_DIRNAME)
+        if os.path.isdir(path):
+            try:
+                return UserRatingIndex.load(path, mmap=True)
+            except Exception as e:
+                print(f"ERROR: {INDEX_DIRNAME}: {e}")
+        if not sampled_df.empty:
+            # No saved index (older artifacts): build it from the training ratings
+            return UserRatingIndex.build(sampled_df, movie_index_map or {})
+        return None
+
+    if not SHARDED:
+        # Holds every user's factors and ratings, so shards never load it
+        collaborative_model = load_pickle("hybrid_cf_model.pkl") or load_pickle("trained_collaborative_model.pkl")
     similarity_matrix = load_pickle("hybrid_similarity_matrix.pkl")
     movie_index_map = load_pickle("hybrid_movie_index_map.pkl")
-    movie_metadata = load_pickle("hybrid_movie_metadata.pkl") or load_pickle("movie_metadata.pkl") or {}
+    movie_metadata = load_metadata_store()
+    if movie_metadata is None:
+        # Older artifact sets only have the pickled dict
+        legacy = load_pickle("hybrid_movie_metadata.pkl") or load_pickle("movie_metadata.pkl") or {}
+        movie_metadata = MovieMetadataStore.from_dict(legacy)
+
+    rating_index = load_rating_index()
 
     if movie_index_map:
         ALL_MOVIES = list(movie_index_map.keys())
+        MOVIE_IDS_BY_ROW = sorted(movie_index_map, key=movie_index_map.get)
+
+    factors = load_factors()
+    popularity = None
+    shard = (SHARD_ID, SHARD_COUNT) if SHARDED else None
+    if shard is not None:
+        if factors is None or rating_index is None:
+            print(f"ERROR: sharded serving needs the {FACTORS_DIRNAME} and {INDEX_DIRNAME} artifacts")
+        else:
+            # Both are memory mapped: count item popularity over everyone, then
+            # copy only the owned users' rows into this process
+            popularity = rating_index.item_counts(len(MOVIE_IDS_BY_ROW))
+            factors, rating_index = shard_user_state(factors, rating_index, *shard)
+            print(f"SHARD {SHARD_ID}/{SHARD_COUNT}: serving {len(rating_index)} users")
+
+    if factors is not None and similarity_matrix is not None and movie_index_map and rating_index is not None:
+        scorer = HybridScorer(
+            factors,
+            similarity_matrix,
+            MOVIE_IDS_BY_ROW,
+            rating_index,
+            popularity,
+        )
+
+    if SCORING_WORKERS > 0 and scorer is not None:
+        try:
+            # Workers and this process memory map the same arrays
+            scorer = load_scorer(MODEL_DIR, mmap=True, shard=shard)
+            scoring_executor = ScoringExecutor(MODEL_DIR, SCORING_WORKERS, SCORING_QUEUE_SIZE, SCORING_TIMEOUT, shard)
+        except Exception as e:
+            print(f"ERROR: scoring workers disabled, {SIMILARITY_DIRNAME} artifacts unavailable: {e}")
     
     yield
 
+    if scoring_executor is not None:
+        scoring_executor.shutdown()
+
 app = FastAPI(
     title="Cinephile API",
     lifespan=lifespan
@@ -95,8 +201,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Opt-in request profiling (PROFILING=header|all); not installed at all when off
+profile_store = ProfileStore()
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware, store=profile_store)
+
 # --- FRONTEND ROUTING (FIXED) ---
 
 # 1. Serve the index.html at the ROOT URL "/"
@@ -119,8 +231,14 @@ if os.path.exists(FRONTEND_DIR):
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
 
+# Concurrent lookups of the same title share one TMDB request
+tmdb_flight = SingleFlight()
+
 def tmdb_search_movie(title: str):
     if not TMDB_API_KEY: return {}
+    return tmdb_flight.do(title, lambda: fetch_tmdb_movie(title))
+
+def fetch_tmdb_movie(title: str):
     try:
         r = requests.get(f"{TMDB_BASE_URL}/search/movie", params={"api_key": TMDB_API_KEY, "query": title}, timeout=5)
         return r.json()["results"][0] if r.status_code == 200 and r.json().get("results") else {}
@@ -142,36 +260,65 @@ def enrich_movie(movie_id: int):
         "rating_tmdb": tmdb_data.get("vote_average")
     }
 
-def content_score(user_id: int, movie_id: int):
-    if movie_id not in movie_index_map or similarity_matrix is None:
-        return 2.75
-    target_idx = movie_index_map[movie_id]
+# --- SCORING SCHEDULER ---
+# /recommend calls arriving within BATCH_WINDOW_MS are scored as one block,
+# and identical concurrent requests share a single execution.
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "3"))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+# Movies that get the exact hybrid score per user; 0 scores the whole catalog
+CANDIDATE_POOL_SIZE = int(os.getenv("CANDIDATE_POOL_SIZE", "300"))
+
+def score_batch(items):
+    user_ids = [uid for uid, _ in items]
+    alphas = [alpha for _, alpha in items]
+    return list(scorer.recommend_scores(user_ids, alphas, CANDIDATE_POOL_SIZE))
+
+recommend_batcher = MicroBatcher(score_batch, window_ms=BATCH_WINDOW_MS, max_batch=BATCH_MAX_SIZE)
+recommend_flight = SingleFlight()
+
+# --- SCORING WORKERS ---
+# SCORING_WORKERS > 0 moves /recommend and /similar scoring to worker processes,
+# with at most SCORING_QUEUE_SIZE tasks in flight (default 4 per worker).
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0"))
+SCORING_QUEUE_SIZE = int(os.getenv("SCORING_QUEUE_SIZE", "0")) or None
+SCORING_TIMEOUT = float(os.getenv("SCORING_TIMEOUT", "5"))
+RETRY_AFTER_SECONDS = os.getenv("RETRY_AFTER_SECONDS", "1")
+
+def run_scoring(fn, *args):
     try:
-        user_ratings = collaborative_model.trainset.ur.get(user_id, [])
-    except: return 2.75
-    if not user_ratings: return 2.75
-    score_sum, weight_sum = 0.0, 0.0
-    for inner_iid, rating in user_ratings:
-        try:
-            raw_id = int(collaborative_model.trainset.to_raw_iid(inner_iid))
-            if raw_id in movie_index_map:
-                idx = movie_index_map[raw_id]
-                sim = similarity_matrix[target_idx][idx]
-                score_sum += sim * rating
-                weight_sum += abs(sim)
-        except: continue
-    if weight_sum == 0: return 2.75
-    return 0.5 + 4.5 * np.clip(score_sum / weight_sum, 0.0, 1.0)
-
-def hybrid_predict(user_id: int, movie_id: int, alpha: float):
-    cf = collaborative_model.predict(user_id, movie_id).est
-    cb = content_score(user_id, movie_id)
-    return alpha * cf + (1 - alpha) * cb
+        return fn(*args)
+    except Overloaded:
+        raise HTTPException(status_code=503, detail="Server busy, retry later", headers={"Retry-After": RETRY_AFTER_SECONDS})
+    except ScoringTimeout:
+        raise HTTPException(status_code=504, detail="Scoring timed out")
+
+def recommendation_items(pairs):
+    results = []
+    for mid, score in pairs:
+        data = enrich_movie(mid)
+        data["predicted_rating"] = round(float(score), 3)
+        results.append(data)
+    return results
+
+def build_recommendations(user_id: int, n: int, alpha: float):
+    if scoring_executor is not None:
+        pairs = run_scoring(scoring_executor.recommend, user_id, n, alpha, CANDIDATE_POOL_SIZE)
+    else:
+        scores = recommend_batcher.submit((user_id, alpha))
+        pairs = scorer.top_n(user_id, scores, n)
+    return recommendation_items(pairs)
+
+def check_shard(user_id: int):
+    if SHARDED:
+        owner = shard_for(user_id, SHARD_COUNT)
+        if owner != SHARD_ID:
+            raise HTTPException(status_code=421, detail=f"User {user_id} is served by shard {owner}")
 
 # --- API ENDPOINTS ---
 @app.get("/health")
 def health():
-    return {"status": "ok", "models_loaded": collaborative_model is not None}
+    return {"status": "ok", "models_loaded": scorer is not None,
+            "shard": SHARD_ID, "shard_count": SHARD_COUNT}
 
 class LoginRequest(BaseModel):
     username: str
@@ -185,46 +332,154 @@ def login(data: LoginRequest):
     return {"user_id": user["user_id"], "role": user["role"], "username": data.username}
 
 @app.get("/recommend")
+@profiled
 def recommend(user_id: int, n: int = Query(10, le=50), alpha: float = Query(0.7, ge=0.0, le=1.0)):
-    if collaborative_model is None or not ALL_MOVIES:
+    if scorer is None or not ALL_MOVIES:
         raise HTTPException(status_code=503, detail="Models not loaded")
-    try:
-        inner_uid = collaborative_model.trainset.to_inner_uid(int(user_id))
-        watched = {int(collaborative_model.trainset.to_raw_iid(iid)) for iid, _ in collaborative_model.trainset.ur.get(inner_uid, [])}
-    except: return []
-    candidates = [m for m in ALL_MOVIES if m not in watched]
-    scores = []
-    for m in candidates:
-        try: scores.append((m, hybrid_predict(user_id, m, alpha)))
-        except: continue
-    scores.sort(key=lambda x: x[1], reverse=True)
-    results = []
-    for mid, score in scores[:n]:
-        data = enrich_movie(mid)
-        data["predicted_rating"] = round(float(score), 3)
-        results.append(data)
+    check_shard(user_id)
+    if not scorer.knows_user(user_id):
+        return []
+    return recommend_flight.do((int(user_id), n, alpha), lambda: build_recommendations(int(user_id), n, alpha))
+
+class BatchRecommendRequest(BaseModel):
+    user_ids: List[int]
+    n: int = Field(10, le=50)
+    alpha: float = Field(0.7, ge=0.0, le=1.0)
+
+@app.post("/recommend/batch")
+def recommend_batch(data: BatchRecommendRequest):
+    """
+    Recommendations for several users at once, keyed by user id.
+    Users are scored in blocks of BATCH_MAX_SIZE, each block as one
+    scoring call (one worker task when SCORING_WORKERS > 0).
+    """
+    if scorer is None or not ALL_MOVIES:
+        raise HTTPException(status_code=503, detail="Models not loaded")
+    user_ids = list(dict.fromkeys(data.user_ids))
+    for uid in user_ids:
+        check_shard(uid)
+
+    results = {str(uid): [] for uid in user_ids}
+    known = [uid for uid in user_ids if scorer.knows_user(uid)]
+    for start in range(0, len(known), BATCH_MAX_SIZE):
+        block = known[start:start + BATCH_MAX_SIZE]
+        if scoring_executor is not None:
+            pairs = run_scoring(scoring_executor.recommend_block, block, data.n, data.alpha, CANDIDATE_POOL_SIZE)
+        else:
+            scores = score_batch([(uid, data.alpha) for uid in block])
+            pairs = [scorer.top_n(uid, row, data.n) for uid, row in zip(block, scores)]
+        for uid, user_pairs in zip(block, pairs):
+            results[str(uid)] = recommendation_items(user_pairs)
     return results
 
-@app.get("/user/history")
-def user_history(user_id: int):
+# --- USER HISTORY ---
+HISTORY_FIELDS = ["movie_id", "title", "genres", "cast", "rating", "timestamp",
+                  "poster", "backdrop", "overview", "release_date", "rating_tmdb"]
+# Page size when a cursor is given without a limit
+HISTORY_PAGE_SIZE = 50
+# Fields that only exist after a TMDB lookup
+TMDB_FIELDS = {"poster", "backdrop", "overview", "release_date", "rating_tmdb"}
+
+def parse_fields(fields, default):
+    if not fields:
+        return default
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in HISTORY_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def encode_cursor(key, movie_id):
+    return base64.urlsafe_b64encode(json.dumps([key, movie_id]).encode()).decode()
+
+def decode_cursor(cursor):
     try:
-        inner_uid = collaborative_model.trainset.to_inner_uid(int(user_id))
-        user_ratings = collaborative_model.trainset.ur.get(inner_uid, [])
-        history = []
-        for inner_iid, rating in user_ratings:
-            mid = int(collaborative_model.trainset.to_raw_iid(inner_iid))
-            movie_data = enrich_movie(mid)
-            history.append({"movie_id": mid, "title": movie_data.get("title"), "poster": movie_data.get("poster"), "rating": float(rating)})
-        return history
-    except: return []
+        key, movie_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(key), int(movie_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def sorted_user_history(user_id: int, order_by: str):
+    """
+    A user's (movie_ids, ratings, timestamps), newest / highest rated first,
+    ties broken by movie_id so the order is stable for cursors.
+    """
+    if rating_index is None:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty.astype(float), empty
+    # The index already keeps each user's entries newest first
+    mids, _, ratings, stamps = rating_index.user_slice(user_id)
+    mids, ratings, stamps = mids.astype(np.int64), ratings.astype(float), np.asarray(stamps)
+    if order_by == "rating":
+        order = np.lexsort((mids, -ratings))
+        mids, ratings, stamps = mids[order], ratings[order], stamps[order]
+    return mids, ratings, stamps
+
+def history_item(movie_id: int, rating: float, timestamp: int, fields):
+    if TMDB_FIELDS.intersection(fields):
+        data = enrich_movie(movie_id)
+    else:
+        meta = movie_metadata.get(movie_id, {})
+        data = {"movie_id": movie_id, "title": meta.get("title", "Unknown"),
+                "genres": meta.get("genres", "N/A"), "cast": meta.get("cast_names", "N/A")}
+    data["rating"] = float(rating)
+    data["timestamp"] = int(timestamp)
+    return {f: data.get(f) for f in fields}
+
+@app.get("/user/history")
+def user_history(
+    user_id: int,
+    response: Response,
+    limit: int = Query(None, ge=1, le=500, description="Page size; without limit and cursor the whole history is returned"),
+    cursor: str = Query(None),
+    order_by: str = Query("timestamp", pattern="^(timestamp|rating)$"),
+    fields: str = Query(None, description="Comma separated subset of fields; TMDB lookups are skipped unless needed"),
+):
+    selected = parse_fields(fields, ["movie_id", "title", "poster", "rating"])
+    check_shard(user_id)
+    mids, ratings, stamps = sorted_user_history(user_id, order_by)
+    key = stamps if order_by == "timestamp" else ratings
+
+    start = 0
+    if cursor:
+        last_key, last_mid = decode_cursor(cursor)
+        after = (key < last_key) | ((key == last_key) & (mids > last_mid))
+        start = int(np.argmax(after)) if after.any() else len(mids)
+
+    if limit is None:
+        # Unpaged callers (the frontend) keep getting the full history
+        limit = HISTORY_PAGE_SIZE if cursor else len(mids)
+    end = min(start + limit, len(mids))
+    if end < len(mids):
+        last_key = int(key[end - 1]) if order_by == "timestamp" else float(key[end - 1])
+        response.headers["X-Next-Cursor"] = encode_cursor(last_key, int(mids[end - 1]))
+
+    return [history_item(int(mids[i]), ratings[i], stamps[i], selected) for i in range(start, end)]
+
+@app.get("/user/history/export")
+def export_user_history(
+    user_id: int,
+    order_by: str = Query("timestamp", pattern="^(timestamp|rating)$"),
+    fields: str = Query(None),
+):
+    selected = parse_fields(fields, ["movie_id", "title", "rating", "timestamp"])
+    check_shard(user_id)
+    mids, ratings, stamps = sorted_user_history(user_id, order_by)
+
+    def stream():
+        yield "["
+        for i in range(len(mids)):
+            if i:
+                yield ","
+            yield json.dumps(history_item(int(mids[i]), ratings[i], stamps[i], selected))
+        yield "]"
+
+    return StreamingResponse(stream(), media_type="application/json")
 
 @app.get("/search")
+@profiled
 def search_movies(query: str = Query(..., min_length=1)):
-    results = []
-    for mid, meta in movie_metadata.items():
-        if query.lower() in meta.get("title", "").lower():
-            results.append(enrich_movie(mid))
-    return results[:20]
+    return [enrich_movie(mid) for mid in movie_metadata.title_matches(query)[:20]]
 
 @app.get("/admin/stats")
 def admin_stats(username: str = Query(None)):
@@ -235,8 +490,22 @@ def admin_stats(username: str = Query(None)):
     total_movies = int(movies_df["movieId"].nunique()) if not movies_df.empty and "movieId" in movies_df.columns else 0
     total_ratings = int(len(ratings_df)) if not ratings_df.empty else 0
     
+    if sampled_df.empty and rating_index is not None:
+        # Sharded: only this shard's users are loaded
+        total_users = len(rating_index)
+        total_ratings = int(rating_index.indptr[-1])
+
     user_metrics = []
-    if not sampled_df.empty and "userId" in sampled_df.columns:
+    if sampled_df.empty and rating_index is not None:
+        for uid in rating_index.user_ids[:10]:
+            _, _, u_ratings, _ = rating_index.user_slice(int(uid))
+            user_metrics.append({
+                "user_id": int(uid),
+                "ratings_count": int(len(u_ratings)),
+                "avg_rating": round(float(u_ratings.mean()), 2),
+                "last_activity": "Recent"
+            })
+    elif not sampled_df.empty and "userId" in sampled_df.columns:
         unique_user_ids = sampled_df['userId'].unique()[:10]
         for uid in unique_user_ids:
             u_ratings = sampled_df[sampled_df['userId'] == uid]
@@ -255,6 +524,21 @@ def admin_stats(username: str = Query(None)):
         "user_metrics": user_metrics
     }
 
+@app.get("/admin/profiles")
+def list_profiles(username: str = Query(None)):
+    if username != "admin":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    return profile_store.list()
+
+@app.get("/admin/profiles/{name}")
+def download_profile(name: str, username: str = Query(None), format: str = Query("json", pattern="^(json|prof)$")):
+    if username != "admin":
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    path = profile_store.file_path(name, f".{format}")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=os.path.basename(path))
+
 @app.get("/trending")
 def get_trending(limit: int = Query(20, le=50)):
     # Simple trending logic: return a slice of your movies
@@ -277,31 +561,24 @@ def get_movie_details(movie_id: int):
 
 @app.get("/recommend/genre")
 def recommend_by_genre(genre: str, n: int = 20):
-    results = []
-    for mid, meta in movie_metadata.items():
-        if genre.lower() in meta.get("genres", "").lower():
-            results.append(enrich_movie(mid))
-        if len(results) >= n:
-            break
+    results = [enrich_movie(mid) for mid in movie_metadata.genre_matches(genre)[:n]]
     if not results:
         raise HTTPException(status_code=404, detail="No movies found for this genre")
     return results
 
 @app.get("/similar")
+@profiled
 def similar_movies(movie_id: int, n: int = 10):
     if movie_id not in movie_index_map:
         raise HTTPException(404, "movie not found")
 
-    idx = movie_index_map[movie_id]
-    sims = similarity_matrix[idx]
-    pairs = list(enumerate(sims))
-    pairs.sort(key=lambda x: x[1], reverse=True)
+    if scoring_executor is not None:
+        pairs = run_scoring(scoring_executor.similar, movie_id, n) or []
+    else:
+        pairs = top_similar(similarity_matrix, MOVIE_IDS_BY_ROW, movie_index_map[movie_id], n)
 
     results = []
-    movie_ids = list(movie_index_map.keys())
-
-    for i, sim in pairs[1:n+1]:
-        mid = movie_ids[i]
+    for mid, sim in pairs:
         data = enrich_movie(mid)
         data["similarity"] = round(float(sim), 3)
         results.append(data)
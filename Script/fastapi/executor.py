@@ -0,0 +1,129 @@
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from Script.fastapi.scoring import load_scorer
+
+
+class Overloaded(Exception):
+    """Raised when the scoring queue is full; the caller should retry later."""
+
+
+class ScoringTimeout(Exception):
+    """Raised when a scoring task does not finish within the request timeout."""
+
+
+# -------------------------------
+# Worker side
+# -------------------------------
+# Each worker process memory maps the serving artifacts once; the OS page
+# cache shares those pages between all workers read-only.
+_scorer = None
+
+
+def _init_worker(model_dir, shard):
+    global _scorer
+    _scorer = load_scorer(model_dir, mmap=True, shard=shard)
+
+
+def _recommend(user_id, n, alpha, pool_size):
+    if not _scorer.knows_user(user_id):
+        return []
+    scores = _scorer.recommend_scores([user_id], [alpha], pool_size)[0]
+    return _scorer.top_n(user_id, scores, n)
+
+
+def _recommend_block(user_ids, n, alpha, pool_size):
+    known = [uid for uid in user_ids if _scorer.knows_user(uid)]
+    pairs = {}
+    if known:
+        scores = _scorer.recommend_scores(known, [alpha] * len(known), pool_size)
+        pairs = {uid: _scorer.top_n(uid, row, n) for uid, row in zip(known, scores)}
+    return [pairs.get(uid, []) for uid in user_ids]
+
+
+def _similar(movie_id, n):
+    return _scorer.similar(movie_id, n)
+
+
+# -------------------------------
+# API side
+# -------------------------------
+class ScoringExecutor:
+    """
+    Runs CPU-bound scoring on a pool of worker processes so requests are not
+    serialized by the GIL.
+
+    At most max_pending tasks may be queued or running; beyond that submit()
+    raises Overloaded immediately instead of queueing (load shedding). Each
+    task must finish within timeout seconds or ScoringTimeout is raised.
+    shard=(id, count) restricts the workers to that shard's users.
+
+    A worker that dies (OOM kill, segfault) breaks the whole process pool;
+    the pool is then replaced and the task retried once on the new one, and
+    Overloaded is raised if that fails as well.
+    """
+
+    def __init__(self, model_dir, workers, max_pending=None, timeout=5.0, shard=None):
+        self.timeout = timeout
+        self.max_pending = max_pending or workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._workers = workers
+        self._initargs = (model_dir, shard)
+        self._pool_lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=self._initargs,
+        )
+
+    def _replace_pool(self, broken):
+        with self._pool_lock:
+            # Concurrent requests see the same broken pool; replace it once
+            if self._pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+
+    def submit(self, fn, *args):
+        for _ in range(2):
+            pool = self._pool
+            try:
+                return self._run(pool, fn, args)
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+        raise Overloaded()
+
+    def _run(self, pool, fn, args):
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded()
+        try:
+            future = pool.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the task really finishes, even after a timeout
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise ScoringTimeout()
+
+    def recommend(self, user_id, n, alpha, pool_size):
+        return self.submit(_recommend, user_id, n, alpha, pool_size)
+
+    def recommend_block(self, user_ids, n, alpha, pool_size):
+        """
+        One (movie_id, score) list per user, scored together as a single task.
+        """
+        return self.submit(_recommend_block, list(user_ids), n, alpha, pool_size)
+
+    def similar(self, movie_id, n):
+        return self.submit(_similar, movie_id, n)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
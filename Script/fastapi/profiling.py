@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import functools
+import contextvars
+from starlette.concurrency import run_in_threadpool
+
+# -------------------------------
+# Settings
+# -------------------------------
+# PROFILING=off     (default) nothing is installed, endpoints run unwrapped
+# PROFILING=header  profile requests sent with "X-Profile-User: admin"
+# PROFILING=all     profile every request to the endpoints below
+#
+# Only the request's own thread is profiled. /recommend scoring runs on the
+# micro-batch leader's thread or in scoring worker processes, so its profile
+# mostly shows the wait for the result; profile HybridScorer offline (e.g.
+# candidate_recall.py under cProfile) to see the scoring itself.
+PROFILING_MODE = os.getenv("PROFILING", "off").lower()
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.abspath(os.path.join(os.path.dirname(__file__), "../../profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "20"))
+PROFILE_TOP_FUNCTIONS = 30
+
+PROFILED_PATHS = {"/recommend", "/similar", "/search"}
+PROFILE_HEADER = b"x-profile-user"
+ADMIN_USER = b"admin"
+
+# <time_ns, zero padded>-<random>-<endpoint>: names sort in save order
+NAME_PATTERN = re.compile(r"^[0-9]{20}-[0-9a-f]{8}-[a-z_]+$")
+
+# The profiler of the request being handled; sync endpoints see it through
+# the context copied into FastAPI's threadpool.
+_active_profiler = contextvars.ContextVar("active_profiler", default=None)
+
+
+def profiling_enabled():
+    return PROFILING_MODE in ("header", "all")
+
+
+def profiled(fn):
+    """
+    Run the endpoint under the request's profiler when one is active.
+    Work the endpoint hands to other threads or processes is not captured.
+    Returns fn untouched when profiling is off.
+    """
+    if not profiling_enabled():
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiler = _active_profiler.get()
+        if profiler is None:
+            return fn(*args, **kwargs)
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler already owns this interpreter/thread
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+
+    return wrapper
+
+
+# -------------------------------
+# On-disk ring buffer
+# -------------------------------
+class ProfileStore:
+    """
+    Keeps the newest max_files profiles in a directory. Each profile is a
+    cProfile dump (<name>.prof) plus a JSON summary (<name>.json) with the
+    request and the top functions by cumulative time.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, path, query, elapsed, profiler):
+        profiler.create_stats()
+        if not profiler.stats:
+            # The request never reached a profiled endpoint (e.g. validation error)
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        endpoint = path.strip("/").replace("/", "_") or "root"
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}-{endpoint}"
+
+        profiler.dump_stats(os.path.join(self.directory, f"{name}.prof"))
+        stats = pstats.Stats(profiler)
+        functions = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            functions.append({
+                "function": f"{os.path.basename(filename)}:{line}({func})",
+                "ncalls": nc,
+                "tottime": round(tt, 6),
+                "cumtime": round(ct, 6),
+            })
+        functions.sort(key=lambda f: f["cumtime"], reverse=True)
+
+        summary = {
+            "name": name,
+            "path": path,
+            "query": query,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "created": time.time(),
+            "functions": functions[:PROFILE_TOP_FUNCTIONS],
+        }
+        with open(os.path.join(self.directory, f"{name}.json"), "w") as f:
+            json.dump(summary, f)
+
+        self.prune()
+        return name
+
+    def prune(self):
+        names = sorted(n[:-len(".json")] for n in os.listdir(self.directory) if n.endswith(".json"))
+        for name in names[:max(0, len(names) - self.max_files)]:
+            for ext in (".json", ".prof"):
+                try:
+                    os.remove(os.path.join(self.directory, name + ext))
+                except FileNotFoundError:
+                    pass
+
+    def list(self):
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for n in sorted(os.listdir(self.directory), reverse=True):
+            if not n.endswith(".json"):
+                continue
+            with open(os.path.join(self.directory, n)) as f:
+                summary = json.load(f)
+            entries.append({k: summary[k] for k in ("name", "path", "query", "elapsed_ms", "created")})
+        return entries
+
+    def file_path(self, name, ext):
+        """
+        Path of a stored profile file, or None for unknown / malformed names.
+        """
+        if not NAME_PATTERN.match(name) or ext not in (".json", ".prof"):
+            return None
+        path = os.path.join(self.directory, name + ext)
+        return path if os.path.exists(path) else None
+
+
+# -------------------------------
+# Middleware
+# -------------------------------
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware: picks the requests to profile, exposes a fresh
+    cProfile.Profile to the endpoint and stores the result afterwards.
+    """
+
+    def __init__(self, app, store):
+        self.app = app
+        self.store = store
+
+    def _wanted(self, scope):
+        if scope["type"] != "http" or scope["path"] not in PROFILED_PATHS:
+            return False
+        if PROFILING_MODE == "all":
+            return True
+        return dict(scope["headers"]).get(PROFILE_HEADER) == ADMIN_USER
+
+    async def __call__(self, scope, receive, send):
+        if not self._wanted(scope):
+            return await self.app(scope, receive, send)
+
+        profiler = cProfile.Profile()
+        token = _active_profiler.set(profiler)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _active_profiler.reset(token)
+            elapsed = time.perf_counter() - start
+            try:
+                await run_in_threadpool(
+                    self.store.save, scope["path"], scope.get("query_string", b"").decode(), elapsed, profiler
+                )
+            except Exception as e:
+                print(f"ERROR: could not save profile: {e}")
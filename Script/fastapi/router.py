@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import itertools
+import subprocess
+from contextlib import asynccontextmanager
+from typing import List
+import httpx
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
+from Script.fastapi.sharding import shard_for
+
+# -------------------------------
+# Shard Router
+# -------------------------------
+# Thin front for N backend shards started with SHARD_ID / SHARD_COUNT:
+#   - per-user endpoints go to the shard owning user_id
+#   - /recommend/batch is split by shard and the answers merged
+#   - everything else (catalog, search, similar, ...) goes to any shard
+#
+#   uvicorn Script.fastapi.router:app   with SHARD_URLS=http://a:8001,http://b:8002
+#   python -m Script.fastapi.router --shards 3   starts local shards plus the router
+
+USER_ROUTES = ["/recommend", "/user/history", "/user/history/export"]
+
+# Recomputed by the router's own server
+HOP_HEADERS = {"host", "content-length", "transfer-encoding", "connection", "content-encoding"}
+
+
+class BatchRecommendRequest(BaseModel):
+    user_ids: List[int]
+    n: int = Field(10, le=50)
+    alpha: float = Field(0.7, ge=0.0, le=1.0)
+
+
+def strip_headers(headers):
+    return {k: v for k, v in headers.items() if k.lower() not in HOP_HEADERS}
+
+
+def create_router(shard_urls, transport=None, timeout=10.0):
+    """
+    Router app for the given shard base URLs; shard i must run with SHARD_ID=i
+    and SHARD_COUNT=len(shard_urls). transport is passed to httpx (tests).
+    """
+    shard_urls = [url.rstrip("/") for url in shard_urls if url]
+    if not shard_urls:
+        raise ValueError("At least one shard URL is required")
+    shard_count = len(shard_urls)
+    spread = itertools.cycle(range(shard_count))
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.client = httpx.AsyncClient(transport=transport, timeout=timeout)
+        yield
+        await app.state.client.aclose()
+
+    app = FastAPI(title="Cinephile Router", lifespan=lifespan)
+
+    async def send(request: Request, shard: int, method: str, path: str, stream=False, **kwargs):
+        client = request.app.state.client
+        try:
+            upstream = client.build_request(method, shard_urls[shard] + path, **kwargs)
+            return await client.send(upstream, stream=stream)
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Shard {shard} unavailable: {e}")
+
+    async def forward(request: Request, shard: int):
+        # Streamed through, so exports are not buffered in the router
+        upstream = await send(
+            request, shard, request.method, request.url.path, stream=True,
+            params=request.query_params,
+            content=await request.body(),
+            headers=strip_headers(request.headers),
+        )
+        return StreamingResponse(
+            upstream.aiter_bytes(),
+            status_code=upstream.status_code,
+            headers=strip_headers(upstream.headers),
+            background=BackgroundTask(upstream.aclose),
+        )
+
+    @app.get("/health")
+    async def health(request: Request):
+        async def check(shard):
+            try:
+                r = await request.app.state.client.get(shard_urls[shard] + "/health")
+                return {**(r.json() if r.status_code == 200 else {}), "url": shard_urls[shard], "http_status": r.status_code}
+            except httpx.HTTPError:
+                return {"url": shard_urls[shard], "http_status": None, "status": "unreachable"}
+
+        shards = await asyncio.gather(*(check(s) for s in range(shard_count)))
+        healthy = all(s["http_status"] == 200 for s in shards)
+        return {
+            "status": "ok" if healthy else "degraded",
+            "models_loaded": healthy and all(s.get("models_loaded") for s in shards),
+            "shards": shards,
+        }
+
+    async def user_route(request: Request):
+        try:
+            shard = shard_for(int(request.query_params["user_id"]), shard_count)
+        except (KeyError, ValueError):
+            # Let a backend produce the usual validation error
+            shard = next(spread)
+        return await forward(request, shard)
+
+    for path in USER_ROUTES:
+        app.add_api_route(path, user_route, methods=["GET"])
+
+    @app.post("/recommend/batch")
+    async def recommend_batch(data: BatchRecommendRequest, request: Request):
+        groups = {}
+        for uid in dict.fromkeys(data.user_ids):
+            groups.setdefault(shard_for(uid, shard_count), []).append(uid)
+
+        shards = list(groups)
+        responses = await asyncio.gather(*(
+            send(request, shard, "POST", "/recommend/batch",
+                 json={"user_ids": groups[shard], "n": data.n, "alpha": data.alpha})
+            for shard in shards
+        ))
+
+        merged = {}
+        for response in responses:
+            if response.status_code != 200:
+                return Response(response.content, status_code=response.status_code, headers=strip_headers(response.headers))
+            merged.update(response.json())
+        return {str(uid): merged.get(str(uid), []) for uid in dict.fromkeys(data.user_ids)}
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE"], include_in_schema=False)
+    async def any_shard(path: str, request: Request):
+        return await forward(request, next(spread))
+
+    return app
+
+
+# Module-level app for `uvicorn Script.fastapi.router:app`
+SHARD_URLS = os.getenv("SHARD_URLS", "")
+app = create_router(SHARD_URLS.split(",")) if SHARD_URLS else None
+
+
+# -------------------------------
+# Local Launcher
+# -------------------------------
+def wait_for_shards(shard_urls, timeout=300.0):
+    """
+    Block until every shard answers /health (models are loaded in lifespan).
+    """
+    deadline = time.time() + timeout
+    pending = list(shard_urls)
+    while pending and time.time() < deadline:
+        for url in list(pending):
+            try:
+                if httpx.get(url + "/health", timeout=2.0).status_code == 200:
+                    pending.remove(url)
+            except httpx.HTTPError:
+                pass
+        if pending:
+            time.sleep(1.0)
+    if pending:
+        raise RuntimeError(f"Shards did not start: {', '.join(pending)}")
+
+
+def launch(shards, host="0.0.0.0", port=8000, base_port=8001):
+    """
+    Start `shards` local backend processes on base_port.. and serve the router on port.
+    """
+    import uvicorn
+
+    shard_urls = [f"http://127.0.0.1:{base_port + i}" for i in range(shards)]
+    processes = []
+    try:
+        for i in range(shards):
+            env = dict(os.environ, SHARD_ID=str(i), SHARD_COUNT=str(shards))
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "Script.fastapi.backend:app",
+                 "--host", "127.0.0.1", "--port", str(base_port + i)],
+                env=env,
+            ))
+        wait_for_shards(shard_urls)
+        print(f"SUCCESS: {shards} shards ready, router on {host}:{port}")
+        uvicorn.run(create_router(shard_urls), host=host, port=port)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run user-sharded backends behind a local router.")
+    parser.add_argument("--shards", type=int, default=2)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--base-port", type=int, default=8001)
+    args = parser.parse_args()
+    launch(args.shards, args.host, args.port, args.base_port)
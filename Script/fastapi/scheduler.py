@@ -0,0 +1,107 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the
+    function, everyone who arrives while it is running waits for and receives
+    the same result (or exception). Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads within a short window and
+    hands them to batch_fn as one list, so a block computation can replace
+    one computation per request.
+
+    The first thread to submit into an empty queue becomes the leader: it
+    waits up to window_ms (or until max_batch items are queued) and runs
+    batch_fn on one batch, which includes its own item. Leadership then
+    passes to the oldest waiting submitter, so no thread keeps draining on
+    behalf of others after its own result is ready. Other submitters just
+    wait for their own result. batch_fn must return one result per item,
+    in order.
+    """
+
+    def __init__(self, batch_fn, window_ms=3.0, max_batch=64):
+        self.batch_fn = batch_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending = []
+        # Future of the submitter currently allowed to run a batch
+        self._leader = None
+
+    def submit(self, item):
+        future = Future()
+        with self._cond:
+            self._pending.append((item, future))
+            first = self._leader is None
+            if first:
+                self._leader = future
+            elif len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+            # Wait for our result, or until leadership is handed to us
+            while not future.done() and self._leader is not future:
+                self._cond.wait()
+
+        if not future.done():
+            # A handed-over leader's batch already queued up while it waited
+            self._lead(wait=first)
+        return future.result()
+
+    def _lead(self, wait):
+        with self._cond:
+            if wait:
+                deadline = time.monotonic() + self.window
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.max_batch,
+                    timeout=max(0.0, deadline - time.monotonic()),
+                )
+            batch = self._pending[:self.max_batch]
+            self._pending = self._pending[self.max_batch:]
+
+        items = [item for item, _ in batch]
+        try:
+            results = list(self.batch_fn(items))
+            if len(results) != len(batch):
+                raise RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            with self._cond:
+                self._leader = self._pending[0][1] if self._pending else None
+                self._cond.notify_all()
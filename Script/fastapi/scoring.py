@@ -0,0 +1,235 @@
+import os
+import numpy as np
+from Script.models.quantize import QuantizedMatrix
+from Script.models.factors import CFFactors, FACTORS_DIRNAME
+from Script.models.rating_index import UserRatingIndex, INDEX_DIRNAME
+from Script.models.content_index import load_similarity, SIMILARITY_DIRNAME
+from Script.fastapi.sharding import shard_user_state
+
+# Content score used when a user has no usable ratings (matches the old per-item loop)
+NEUTRAL_CONTENT_SCORE = 2.75
+# Ratings at or above this seed the content-neighbour candidates
+HIGH_RATING = 4.0
+MAX_SEED_MOVIES = 50
+
+
+class HybridScorer:
+    """
+    Vectorized version of the hybrid blend the API serves:
+
+        alpha * cf(u, i) + (1 - alpha) * content(u, i)
+
+    Scores a block of users against every movie of the similarity matrix in
+    a few matrix products instead of one Python call per (user, movie).
+
+    factors        CFFactors (collaborative side)
+    similarity     square, symmetric movie-movie similarity matrix
+    movie_ids      raw movie id of every similarity row, in row order
+    rating_index   UserRatingIndex whose item_idx follows the same rows
+    popularity     ratings per similarity row; defaults to rating_index's
+                   counts (pass the global counts when the index is a shard)
+    """
+
+    def __init__(self, factors, similarity, movie_ids, rating_index, popularity=None):
+        self.factors = factors
+        self.similarity = similarity
+        self.movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        self.rating_index = rating_index
+        self.user_pos = {int(uid): pos for pos, uid in enumerate(factors.user_ids)}
+
+        # Align item factors with similarity rows; items the CF model never saw
+        # keep zero bias and zero factors, which reproduces surprise's estimate.
+        item_pos = {int(mid): pos for pos, mid in enumerate(factors.item_ids)}
+        cf_rows = np.array([item_pos.get(int(mid), -1) for mid in self.movie_ids], dtype=np.int64)
+        known = cf_rows >= 0
+        self.item_known = known
+        self.bi = np.zeros(len(self.movie_ids))
+        self.bi[known] = factors.bi[cf_rows[known]]
+        # Aligned item factors are cached at float32 (float64 if stored so):
+        # BLAS has no float16/int8 path, and candidates() reads every row for
+        # each user. Stored int8/float16 factors still save disk and pu memory.
+        self.qi = np.zeros((len(self.movie_ids), factors.n_factors), dtype=_compute_dtype(factors.qi))
+        self.qi[known] = factors.qi[cf_rows[known]]
+
+        # Number of ratings per similarity row, for the popular-items candidates
+        if popularity is None:
+            popularity = rating_index.item_counts(self.n_items)
+        self.popularity = np.asarray(popularity, dtype=np.float64)
+
+    @property
+    def n_items(self):
+        return len(self.movie_ids)
+
+    def knows_user(self, user_id):
+        return int(user_id) in self.user_pos
+
+    def rated(self, user_id):
+        return self.rating_index.rated(user_id)
+
+    def watched_mask(self, user_id):
+        return self.rating_index.watched_mask(user_id, self.n_items)
+
+    # -------------------------------
+    # Block scoring
+    # -------------------------------
+    def cf_block(self, user_ids, items=None):
+        """
+        Collaborative estimates for each user against `items` (similarity
+        rows, default: the whole catalog).
+        """
+        items = np.arange(self.n_items) if items is None else items
+        f = self.factors
+        est = np.full((len(user_ids), len(items)), f.global_mean)
+        est += self.bi[items]
+        pos = np.array([self.user_pos.get(int(uid), -1) for uid in user_ids], dtype=np.int64)
+        known = pos >= 0
+        if known.any():
+            # Unknown items have qi == 0, so the dot product adds nothing for them
+            pu = np.asarray(f.pu[pos[known]], dtype=self.qi.dtype)
+            est[known] += f.bu[pos[known]][:, None] + pu @ self.qi[items].T
+        return np.clip(est, *f.rating_scale)
+
+    def content_block(self, user_ids, items=None):
+        items = np.arange(self.n_items) if items is None else items
+        rated = [self.rated(uid) for uid in user_ids]
+        cols = np.unique(np.concatenate([r[0] for r in rated])) if rated else np.array([], dtype=np.int64)
+        if len(cols) == 0:
+            return np.full((len(user_ids), len(items)), NEUTRAL_CONTENT_SCORE)
+
+        # Dense ratings / mask over only the movies anyone in the block rated
+        R = np.zeros((len(user_ids), len(cols)))
+        M = np.zeros((len(user_ids), len(cols)))
+        for row, (idx, values) in enumerate(rated):
+            k = np.searchsorted(cols, idx)
+            R[row, k] = values
+            M[row, k] = 1.0
+
+        # similarity is symmetric, so rated rows double as rated columns
+        sub = gather_block(self.similarity, cols, items)
+        num = R @ sub
+        den = M @ np.abs(sub)
+
+        out = np.full(num.shape, NEUTRAL_CONTENT_SCORE)
+        ok = den != 0
+        out[ok] = 0.5 + 4.5 * np.clip(num[ok] / den[ok], 0.0, 1.0)
+        return out
+
+    def score_block(self, user_ids, alphas, items=None):
+        """
+        (len(user_ids), len(items)) hybrid scores; alphas holds one weight per user.
+        """
+        alphas = np.asarray(alphas, dtype=np.float64)[:, None]
+        return alphas * self.cf_block(user_ids, items) + (1 - alphas) * self.content_block(user_ids, items)
+
+    # -------------------------------
+    # Two-stage retrieval
+    # -------------------------------
+    def candidates(self, user_id, pool_size):
+        """
+        Cheap first stage: up to pool_size unwatched similarity rows drawn from
+        the best item-factor scores, the content neighbours of the user's
+        highly rated movies, and the most popular movies.
+        """
+        watched = self.watched_mask(user_id)
+        picked = np.zeros(self.n_items, dtype=bool)
+
+        def take(scores, k):
+            scores = np.where(watched | picked, -np.inf, scores)
+            k = min(k, int(np.isfinite(scores).sum()))
+            if k > 0:
+                picked[np.argpartition(-scores, k - 1)[:k]] = True
+
+        pos = self.user_pos.get(int(user_id))
+        if pos is not None:
+            take(self.bi + self.qi @ np.asarray(self.factors.pu[pos], dtype=self.qi.dtype), pool_size // 2)
+
+        idx, values = self.rated(user_id)
+        if len(idx):
+            # Highest rated first; fall back to the user's favourites if none reach HIGH_RATING
+            order = np.argsort(-values, kind="stable")
+            liked = idx[order][values[order] >= min(HIGH_RATING, values.max())][:MAX_SEED_MOVIES]
+            take(np.asarray(self.similarity[liked]).sum(axis=0, dtype=np.float64), pool_size // 3)
+
+        take(self.popularity, pool_size - int(picked.sum()))
+        return np.flatnonzero(picked)
+
+    def recommend_scores(self, user_ids, alphas, pool_size=None):
+        """
+        Hybrid scores over the full catalog for a block of users. With a
+        pool_size, only each user's candidates get the exact blend and every
+        other movie scores -inf.
+        """
+        if not pool_size or pool_size >= self.n_items:
+            return self.score_block(user_ids, alphas)
+
+        pools = [self.candidates(uid, pool_size) for uid in user_ids]
+        union = np.unique(np.concatenate(pools))
+        exact = self.score_block(user_ids, alphas, union)
+
+        scores = np.full((len(user_ids), self.n_items), -np.inf)
+        for row, pool in enumerate(pools):
+            cols = np.searchsorted(union, pool)
+            scores[row, pool] = exact[row, cols]
+        return scores
+
+    def similar(self, movie_id, n):
+        idx = np.flatnonzero(self.movie_ids == movie_id)
+        if len(idx) == 0:
+            return None
+        return top_similar(self.similarity, self.movie_ids, int(idx[0]), n)
+
+    def top_n(self, user_id, scores, n):
+        """
+        Best n (movie_id, score) pairs among movies the user has not rated.
+        """
+        scores = np.where(self.watched_mask(user_id), -np.inf, scores)
+        n = min(n, int(np.isfinite(scores).sum()))
+        if n <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.movie_ids[i]), float(scores[i])) for i in top]
+
+
+def _compute_dtype(array):
+    return np.float64 if array.dtype == np.float64 else np.float32
+
+
+def gather_block(matrix, rows, cols):
+    """
+    matrix[rows][:, cols] as float64, without expanding the full rows.
+    """
+    if isinstance(matrix, QuantizedMatrix):
+        return matrix.block(rows, cols).astype(np.float64)
+    return np.asarray(matrix[np.ix_(rows, cols)], dtype=np.float64)
+
+
+def top_similar(similarity, movie_ids, idx, n):
+    """
+    The n (movie_id, similarity) pairs closest to similarity row idx, excluding itself.
+    """
+    sims = np.array(similarity[idx], dtype=np.float64)
+    sims[idx] = -np.inf
+    n = min(n, len(sims) - 1)
+    if n <= 0:
+        return []
+    top = np.argpartition(-sims, n - 1)[:n]
+    top = top[np.argsort(-sims[top], kind="stable")]
+    return [(int(movie_ids[i]), float(sims[i])) for i in top]
+
+
+def load_scorer(model_dir, mmap=True, shard=None):
+    """
+    HybridScorer over the memory-mapped serving artifacts in model_dir
+    (cf_factors, similarity_matrix, user_rating_index). With shard=(id, count)
+    only that shard's users are kept.
+    """
+    similarity, movie_ids = load_similarity(os.path.join(model_dir, SIMILARITY_DIRNAME), mmap=mmap)
+    factors = CFFactors.load(os.path.join(model_dir, FACTORS_DIRNAME), mmap=mmap)
+    rating_index = UserRatingIndex.load(os.path.join(model_dir, INDEX_DIRNAME), mmap=mmap)
+    popularity = None
+    if shard is not None:
+        popularity = rating_index.item_counts(len(movie_ids))
+        factors, rating_index = shard_user_state(factors, rating_index, *shard)
+    return HybridScorer(factors, similarity, movie_ids, rating_index, popularity)
+
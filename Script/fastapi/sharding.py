@@ -0,0 +1,36 @@
+import numpy as np
+
+# -------------------------------
+# User Sharding
+# -------------------------------
+# Users are assigned to shards by a stable hash of their id, so the router
+# and every backend process agree on the owner without a lookup table.
+# Item-side artifacts (similarity, item factors, metadata) are replicated;
+# only user-side state (user factors, rating index) is split.
+
+
+def shard_of(user_ids, shard_count):
+    """
+    Shard of each user id: splitmix64(user_id) mod shard_count.
+    """
+    with np.errstate(over="ignore"):
+        z = np.asarray(user_ids).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z % np.uint64(shard_count)).astype(np.int64)
+
+
+def shard_for(user_id, shard_count):
+    return int(shard_of([int(user_id)], shard_count)[0])
+
+
+def shard_user_state(factors, rating_index, shard_id, shard_count):
+    """
+    (factors, rating_index) restricted to the users owned by shard_id.
+    The returned arrays are in-memory copies of just those users; with
+    memory-mapped inputs only the owned rows are read.
+    """
+    factors = factors.select_users(shard_of(factors.user_ids, shard_count) == shard_id)
+    rating_index = rating_index.select_users(shard_of(rating_index.user_ids, shard_count) == shard_id)
+    return factors, rating_index
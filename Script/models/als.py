@@ -0,0 +1,214 @@
+import os
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import scipy.sparse as sp
+from threadpoolctl import threadpool_limits
+from Script.models.factors import CFFactors, FACTORS_DIRNAMES, training_ratings_path
+from Script.data.load_data import load_ratings
+
+# -------------------------------
+# PATH LOGIC
+# -------------------------------
+PROJECT_ROOT = os.getenv("GITHUB_WORKSPACE")
+if not PROJECT_ROOT:
+    PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "Data")
+SAVED_MODELS_DIR = os.path.join(PROJECT_ROOT, "Script", "saved_models")
+CHECKPOINT_DIR = os.path.join(SAVED_MODELS_DIR, "als_checkpoints")
+
+
+# -------------------------------
+# Data
+# -------------------------------
+def load_ratings_csr(path):
+    """
+    Read userId,movieId,rating from a ratings CSV or .npz sample into a users x items CSR matrix.
+    Returns (R, user_ids, item_ids) where row/column k belongs to user_ids[k]/item_ids[k].
+    """
+    df = load_ratings(
+        path,
+        columns=["userId", "movieId", "rating"],
+        dtype={"userId": np.int64, "movieId": np.int64, "rating": np.float32},
+    )
+    user_ids, users = np.unique(df["userId"].values, return_inverse=True)
+    item_ids, items = np.unique(df["movieId"].values, return_inverse=True)
+    R = sp.csr_matrix(
+        (df["rating"].values.astype(np.float64), (users, items)),
+        shape=(len(user_ids), len(item_ids)),
+    )
+    return R, user_ids, item_ids
+
+
+# -------------------------------
+# ALS
+# -------------------------------
+def _plan_blocks(R, block_size, block_entries):
+    """
+    Group the non-empty rows of R into blocks of similar length: at most
+    block_size rows and block_entries padded entries (rows x longest row).
+    """
+    counts = np.diff(R.indptr)
+    rows = np.argsort(counts, kind="stable")
+    rows = rows[counts[rows] > 0]
+    blocks, current = [], []
+    for row, count in zip(rows.tolist(), counts[rows].tolist()):
+        # Rows come shortest first, so the newest row sets the padded length
+        if current and (len(current) >= block_size or count * (len(current) + 1) > block_entries):
+            blocks.append(np.array(current))
+            current = []
+        current.append(row)
+    if current:
+        blocks.append(np.array(current))
+    return blocks
+
+
+def _solve_block(R, fixed, fixed_bias, mu, reg, rows):
+    """
+    Ridge solve [factors, bias] for a block of rows of R against the fixed side:
+
+        min ||r - mu - b_fixed - [f, b] . [x_fixed, 1]||^2 + reg * n_ratings * ||[f, b]||^2
+
+    Each row's ratings are padded with zeros to the block's longest row, so the
+    Gram matrices and right-hand sides are one batched matmul and all rows are
+    solved by one batched np.linalg.solve.
+    """
+    k = fixed.shape[1]
+    starts, counts = R.indptr[rows], R.indptr[rows + 1] - R.indptr[rows]
+    offsets = np.arange(counts.max())
+    valid = offsets[None, :] < counts[:, None]
+    pos = (starts[:, None] + offsets[None, :])[valid]
+    cols = R.indices[pos]
+
+    X = np.zeros((len(rows), len(offsets), k + 1))
+    X[valid, :k] = fixed[cols]
+    X[valid, k] = 1.0
+    y = np.zeros((len(rows), len(offsets)))
+    y[valid] = R.data[pos] - mu - fixed_bias[cols]
+
+    Xt = X.transpose(0, 2, 1)
+    A = Xt @ X + reg * counts[:, None, None] * np.eye(k + 1)
+    w = np.linalg.solve(A, Xt @ y[:, :, None])[:, :, 0]
+    return w[:, :k], w[:, k]
+
+
+def _half_step(executor, R, blocks, fixed, fixed_bias, mu, reg):
+    """
+    Solve every block of rows on the thread pool. Blocks are independent given
+    the fixed side, and the batched matmul / solve calls release the GIL.
+    """
+    factors = np.zeros((R.shape[0], fixed.shape[1]))
+    bias = np.zeros(R.shape[0])
+
+    def solve(rows):
+        factors[rows], bias[rows] = _solve_block(R, fixed, fixed_bias, mu, reg, rows)
+
+    list(executor.map(solve, blocks))
+    return factors, bias
+
+
+def train_rmse(R, mu, pu, qi, bu, bi, chunk=1_000_000):
+    coo = R.tocoo()
+    sq_err = 0.0
+    for s in range(0, coo.nnz, chunk):
+        u, i, r = coo.row[s:s + chunk], coo.col[s:s + chunk], coo.data[s:s + chunk]
+        est = mu + bu[u] + bi[i] + np.einsum("ij,ij->i", pu[u], qi[i])
+        sq_err += float(np.sum((r - est) ** 2))
+    return np.sqrt(sq_err / max(coo.nnz, 1))
+
+
+def train_als(R, user_ids, item_ids, n_factors=50, n_epochs=15, reg=0.05, n_jobs=None,
+              block_size=1024, block_entries=200_000, seed=42, checkpoint_dir=None, resume=False):
+    """
+    Biased ALS (weighted-lambda regularization) on a CSR ratings matrix.
+
+    User and item half-steps are solved block-parallel across n_jobs threads
+    (default: all cores), each block as one batched solve of at most
+    block_size rows and block_entries padded ratings. BLAS is limited to one
+    thread per worker meanwhile so the pool does not oversubscribe. With checkpoint_dir set, factors are saved after
+    every epoch and resume=True continues from the latest checkpoint.
+
+    Returns CFFactors in the form the serving scorer consumes.
+    """
+    rating_scale = (float(R.data.min()), float(R.data.max()))
+    mu = float(R.data.mean())
+    Rt = R.T.tocsr()
+
+    rng = np.random.default_rng(seed)
+    qi = rng.normal(0, 0.1, (R.shape[1], n_factors))
+    bi = np.zeros(R.shape[1])
+    pu = np.zeros((R.shape[0], n_factors))
+    bu = np.zeros(R.shape[0])
+    first_epoch = 0
+
+    if resume and checkpoint_dir:
+        latest = _latest_checkpoint(checkpoint_dir)
+        if latest is not None:
+            epoch, factors = latest
+            same_data = np.array_equal(factors.user_ids, user_ids) and np.array_equal(factors.item_ids, item_ids)
+            if same_data and factors.n_factors == n_factors:
+                pu, bu = np.array(factors.pu), np.array(factors.bu)
+                qi, bi = np.array(factors.qi), np.array(factors.bi)
+                first_epoch = epoch + 1
+                print(f"Resuming ALS from epoch {epoch}")
+
+    user_blocks = _plan_blocks(R, block_size, block_entries)
+    item_blocks = _plan_blocks(Rt, block_size, block_entries)
+
+    with threadpool_limits(limits=1, user_api="blas"), \
+            ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+        for epoch in range(first_epoch, n_epochs):
+            pu, bu = _half_step(executor, R, user_blocks, qi, bi, mu, reg)
+            qi, bi = _half_step(executor, Rt, item_blocks, pu, bu, mu, reg)
+            print(f"Epoch {epoch + 1}/{n_epochs} - train RMSE: {train_rmse(R, mu, pu, qi, bu, bi):.4f}")
+
+            if checkpoint_dir:
+                _save_checkpoint(checkpoint_dir, epoch, CFFactors(mu, rating_scale, user_ids, item_ids, bu, bi, pu, qi))
+
+    return CFFactors(mu, rating_scale, user_ids, item_ids, bu, bi, pu, qi)
+
+
+# -------------------------------
+# Checkpoints
+# -------------------------------
+def _save_checkpoint(checkpoint_dir, epoch, factors, keep=2):
+    factors.save(os.path.join(checkpoint_dir, f"epoch_{epoch:03d}"))
+    with open(os.path.join(checkpoint_dir, "latest.json"), "w") as f:
+        json.dump({"epoch": epoch}, f)
+    for name in sorted(os.listdir(checkpoint_dir)):
+        if name.startswith("epoch_") and int(name[len("epoch_"):]) <= epoch - keep:
+            shutil.rmtree(os.path.join(checkpoint_dir, name), ignore_errors=True)
+
+
+def _latest_checkpoint(checkpoint_dir):
+    path = os.path.join(checkpoint_dir, "latest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        epoch = json.load(f)["epoch"]
+    return epoch, CFFactors.load(os.path.join(checkpoint_dir, f"epoch_{epoch:03d}"), mmap=False)
+
+
+if __name__ == "__main__":
+    df_path = training_ratings_path(DATA_DIR, "als")
+    print(f"DEBUG: Loading ratings from: {df_path}")
+
+    R, user_ids, item_ids = load_ratings_csr(df_path)
+    print(f"DEBUG: {R.shape[0]} users x {R.shape[1]} items, {R.nnz} ratings")
+
+    factors = train_als(
+        R, user_ids, item_ids,
+        n_factors=int(os.getenv("ALS_FACTORS", "50")),
+        n_epochs=int(os.getenv("ALS_EPOCHS", "15")),
+        reg=float(os.getenv("ALS_REG", "0.05")),
+        n_jobs=int(os.getenv("ALS_JOBS", "0")) or None,
+        checkpoint_dir=CHECKPOINT_DIR,
+        resume=os.getenv("ALS_RESUME") == "1",
+    )
+
+    # Served when the API runs with CF_FACTORS=als
+    output_dir = os.path.join(SAVED_MODELS_DIR, FACTORS_DIRNAMES["als"])
+    factors.save(output_dir)
+    print(f"SUCCESS: ALS factors saved in {output_dir}")
@@ -0,0 +1,78 @@
+import os
+import json
+import pickle
+import numpy as np
+from Script.models.factors import CFFactors
+from Script.models.rating_index import UserRatingIndex, INDEX_DIRNAME
+from Script.fastapi.scoring import HybridScorer
+
+# -------------------------------
+# PATH LOGIC
+# -------------------------------
+PROJECT_ROOT = os.getenv("GITHUB_WORKSPACE")
+if not PROJECT_ROOT:
+    PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+SAVED_MODELS_DIR = os.path.join(PROJECT_ROOT, "Script", "saved_models")
+
+# -------------------------------
+# Settings
+# -------------------------------
+POOL_SIZES = [int(p) for p in os.getenv("CANDIDATE_POOL_SIZES", "100,300,1000").split(",")]
+SAMPLE_USERS = int(os.getenv("RECALL_SAMPLE_USERS", "200"))
+TOP_N = int(os.getenv("RECALL_TOP_N", "10"))
+ALPHA = float(os.getenv("RECALL_ALPHA", "0.7"))
+
+def candidate_recall(scorer, user_ids, n=10, pool_size=300, alpha=0.7):
+    """
+    Mean share of the exhaustive top-n that the two-stage pipeline also
+    returns, over user_ids.
+    """
+    recalls = []
+    for uid in user_ids:
+        exact = scorer.recommend_scores([uid], [alpha])[0]
+        staged = scorer.recommend_scores([uid], [alpha], pool_size)[0]
+        expected = {mid for mid, _ in scorer.top_n(uid, exact, n)}
+        if not expected:
+            continue
+        found = {mid for mid, _ in scorer.top_n(uid, staged, n)}
+        recalls.append(len(expected & found) / len(expected))
+    return float(np.mean(recalls)) if recalls else float("nan")
+
+
+def load_pickle(name):
+    with open(os.path.join(SAVED_MODELS_DIR, name), "rb") as f:
+        return pickle.load(f)
+
+if __name__ == "__main__":
+    # -------------------------------
+    # Build the serving scorer from the saved artifacts
+    # -------------------------------
+    collaborative_model = load_pickle("trained_collaborative_model.pkl")
+    similarity_matrix = load_pickle("hybrid_similarity_matrix.pkl")
+    movie_index_map = load_pickle("hybrid_movie_index_map.pkl")
+
+    scorer = HybridScorer(
+        CFFactors.from_surprise(collaborative_model),
+        similarity_matrix,
+        sorted(movie_index_map, key=movie_index_map.get),
+        UserRatingIndex.load(os.path.join(SAVED_MODELS_DIR, INDEX_DIRNAME)),
+    )
+
+    rng = np.random.default_rng(42)
+    users = np.asarray(scorer.rating_index.user_ids)
+    users = rng.choice(users, size=min(SAMPLE_USERS, len(users)), replace=False)
+
+    # -------------------------------
+    # Recall of the two-stage top-n against exhaustive scoring
+    # -------------------------------
+    report = {"top_n": TOP_N, "alpha": ALPHA, "users": len(users), "catalog": scorer.n_items, "recall": {}}
+    for pool_size in POOL_SIZES:
+        recall = candidate_recall(scorer, users, n=TOP_N, pool_size=pool_size, alpha=ALPHA)
+        report["recall"][str(pool_size)] = round(recall, 4)
+        print(f"Pool {pool_size:>5}: recall@{TOP_N} = {recall:.4f}")
+
+    with open(os.path.join(SAVED_MODELS_DIR, "candidate_recall.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"SUCCESS: Candidate recall report saved in {SAVED_MODELS_DIR}")
@@ -1,10 +1,11 @@
 import os
-import pandas as pd
-import json
 import pickle
+from Script.data.load_data import load_ratings
 from surprise import Dataset, Reader, SVD
 from surprise.model_selection import GridSearchCV, train_test_split
 from surprise.accuracy import rmse, mae
+from Script.models.factors import CFFactors, FACTORS_DIRNAMES, training_ratings_path
+from Script.models.compile_metadata import load_compiled_metadata
 
 # -------------------------------
 # PATH LOGIC
@@ -17,74 +18,16 @@ DATA_DIR = os.path.join(PROJECT_ROOT, "Data")
 SAVED_MODELS_DIR = os.path.join(PROJECT_ROOT, "Script", "saved_models")
 os.makedirs(SAVED_MODELS_DIR, exist_ok=True)
 
-df_path = os.getenv('DATA_PATH') or os.path.join(DATA_DIR, "sampled_data.csv")
-mapping_path = os.path.join(DATA_DIR, "movie_mapping.csv")
+df_path = training_ratings_path(DATA_DIR, "svd")
 
 print(f"DEBUG: Project Root: {PROJECT_ROOT}")
 
 # -------------------------------
 # Load datasets
 # -------------------------------
-df = pd.read_csv(df_path)
-mapping_df = pd.read_csv(mapping_path)
-
-# -------------------------------
-# FORCE COLUMN ALIGNMENT (Fixes KeyErrors)
-# -------------------------------
-# 1. Strip whitespace from headers
-mapping_df.columns = [str(c).strip() for c in mapping_df.columns]
-print(f"DEBUG: Original Columns: {list(mapping_df.columns)}")
-
-# 2. Map existing columns to standard names used by the script
-col_map = {}
-for c in mapping_df.columns:
-    low_c = c.lower()
-    if low_c in ['movieid', 'id']: col_map[c] = 'movieId'
-    if low_c in ['genres', 'genre']: col_map[c] = 'genres'
-    if low_c in ['title', 'name']: col_map[c] = 'title'
-    if low_c in ['cast']: col_map[c] = 'cast'
-
-mapping_df = mapping_df.rename(columns=col_map)
-
-# 3. Final Fallback: If 'movieId' is still missing, take the first column
-if 'movieId' not in mapping_df.columns:
-    print("WARNING: Could not find movieId column by name. Using first column as ID.")
-    mapping_df = mapping_df.rename(columns={mapping_df.columns[0]: 'movieId'})
-
-# 4. Fill missing columns with N/A to prevent crashes
-for req in ['genres', 'cast', 'title']:
-    if req not in mapping_df.columns:
-        print(f"WARNING: '{req}' column missing. Creating dummy column.")
-        mapping_df[req] = "N/A"
-
-mapping_df['genres'] = mapping_df['genres'].fillna("N/A")
-mapping_df['cast'] = mapping_df['cast'].fillna("[]")
-
-# -------------------------------
-# Process Movie Metadata
-# -------------------------------
-def extract_cast_names(cast_str, top_n=5):
-    try:
-        if isinstance(cast_str, list):
-            cast_list = cast_str
-        else:
-            cast_list = json.loads(cast_str)
-        names = [c.get('name', 'Unknown') for c in cast_list]
-        return ', '.join(names[:top_n])
-    except Exception:
-        return "N/A"
-
-mapping_df['cast_names'] = mapping_df['cast'].apply(extract_cast_names)
-
-# Create movie_info dictionary - Now guaranteed to have 'movieId'
-movie_info = mapping_df.set_index('movieId')[['title', 'genres', 'cast_names']].to_dict(orient='index')
-movie_info = {int(k): v for k, v in movie_info.items()}
-
-# Ensure all movies in ratings are in movie_info
-for mid in df['movieId'].unique():
-    mid_int = int(mid)
-    if mid_int not in movie_info:
-        movie_info[mid_int] = {'title': 'Unknown', 'genres': 'N/A', 'cast_names': 'N/A'}
+df = load_ratings(df_path)
+# Movie titles for the sample output, from compile_metadata.py
+movie_info = load_compiled_metadata(SAVED_MODELS_DIR)
 
 # -------------------------------
 # Train SVD Model
@@ -115,7 +58,10 @@ def save_pickle(obj, filename):
         pickle.dump(obj, f)
 
 save_pickle(best_model, "trained_collaborative_model.pkl")
-save_pickle(movie_info, "hybrid_movie_metadata.pkl")
+
+# Serving copy of the factors; FACTOR_DTYPE=float16|int8 shrinks pu/qi for the scorer
+FACTOR_DTYPE = os.getenv("FACTOR_DTYPE", "float64")
+CFFactors.from_surprise(best_model).quantized(FACTOR_DTYPE).save(os.path.join(SAVED_MODELS_DIR, FACTORS_DIRNAMES["svd"]))
 
 print(f"SUCCESS: Collaborative artifacts saved in {SAVED_MODELS_DIR}")
 
@@ -124,5 +70,5 @@ if __name__ == "__main__":
     preds = [(m, best_model.predict(uid=1, iid=m).est) for m in all_movies[:5]]
     print(f"\nSample Predictions for User 1:")
     for mid, score in preds:
-        title = movie_info.get(int(mid), {}).get('title', 'Unknown')
+        title = movie_info.title(int(mid))
         print(f"- {title}: {score:.2f}")
\ No newline at end of file
@@ -0,0 +1,162 @@
+import os
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from Script.models.metadata_store import MovieMetadataStore, STORE_DIRNAME, STORE_VERSION
+
+# -------------------------------
+# PATH LOGIC
+# -------------------------------
+PROJECT_ROOT = os.getenv("GITHUB_WORKSPACE")
+if not PROJECT_ROOT:
+    PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "Data")
+SAVED_MODELS_DIR = os.path.join(PROJECT_ROOT, "Script", "saved_models")
+
+# -------------------------------
+# Metadata Compilation
+# -------------------------------
+# Runs once per training pipeline before the models: normalizes
+# movie_mapping.csv, parses the cast JSON and writes the movie metadata store
+# that collaborative.py, content_based.py, hybrid.py and the backend read.
+CAST_TOP_N = 5
+CHUNK_SIZE = 5000
+
+
+def normalize_columns(mapping_df):
+    """
+    Rename id/title/genres/cast columns to movieId/title/genres/cast
+    (tolerating other spellings) and fill missing values.
+    """
+    mapping_df = mapping_df.copy()
+    mapping_df.columns = [str(c).strip() for c in mapping_df.columns]
+
+    col_map = {}
+    for c in mapping_df.columns:
+        low_c = c.lower()
+        if low_c in ['movieid', 'id']: col_map[c] = 'movieId'
+        if low_c in ['genres', 'genre']: col_map[c] = 'genres'
+        if low_c in ['title', 'name']: col_map[c] = 'title'
+        if low_c in ['cast']: col_map[c] = 'cast'
+    mapping_df = mapping_df.rename(columns=col_map)
+
+    if 'movieId' not in mapping_df.columns:
+        print("WARNING: Could not find movieId column by name. Using first column as ID.")
+        mapping_df = mapping_df.rename(columns={mapping_df.columns[0]: 'movieId'})
+
+    for req in ['genres', 'cast', 'title']:
+        if req not in mapping_df.columns:
+            print(f"WARNING: '{req}' column missing. Creating dummy column.")
+            mapping_df[req] = "N/A"
+
+    mapping_df['movieId'] = mapping_df['movieId'].astype(int)
+    mapping_df['genres'] = mapping_df['genres'].fillna("N/A")
+    mapping_df['cast'] = mapping_df['cast'].fillna("[]")
+    return mapping_df
+
+
+def parse_cast(cast_str, top_n=CAST_TOP_N):
+    """
+    "Name 1, Name 2, ..." of the first top_n cast entries, "" if unparsable.
+    """
+    try:
+        cast_list = cast_str if isinstance(cast_str, list) else json.loads(cast_str)
+        return ', '.join([c['name'] for c in cast_list][:top_n])
+    except Exception:
+        return ""
+
+
+def parse_cast_chunk(cast_strings):
+    return [parse_cast(c) for c in cast_strings]
+
+
+def parse_cast_column(cast_strings, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    parse_cast over a whole column, chunks spread over worker processes.
+    """
+    cast_strings = list(cast_strings)
+    chunks = [cast_strings[i:i + chunk_size] for i in range(0, len(cast_strings), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        return [name for chunk in chunks for name in parse_cast_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return [name for names in pool.map(parse_cast_chunk, chunks) for name in names]
+
+
+def build_metadata(mapping_df, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    {movieId: {'title', 'genres', 'cast_names'}} from a raw movie_mapping frame.
+    """
+    mapping_df = normalize_columns(mapping_df)
+    cast_names = parse_cast_column(mapping_df['cast'].values, workers, chunk_size)
+    return {
+        int(mid): {'title': title, 'genres': genres, 'cast_names': cast}
+        for mid, title, genres, cast in zip(mapping_df['movieId'], mapping_df['title'], mapping_df['genres'], cast_names)
+    }
+
+
+def source_fingerprint(mapping_path):
+    """
+    What the store was compiled from; a matching fingerprint means it is up to date.
+    """
+    digest = hashlib.sha256()
+    with open(mapping_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"file": os.path.basename(mapping_path), "sha256": digest.hexdigest(), "cast_top_n": CAST_TOP_N}
+
+
+def compile_metadata(mapping_path, output_dir, workers=None, chunk_size=CHUNK_SIZE, force=False):
+    """
+    Compile movie_mapping.csv into a MovieMetadataStore at output_dir, unless
+    the store there was already built from the same file.
+    Returns (store, compiled).
+    """
+    source = source_fingerprint(mapping_path)
+    header = MovieMetadataStore.read_header(output_dir)
+    if not force and header and header.get("version") == STORE_VERSION and header.get("source") == source:
+        return MovieMetadataStore.load(output_dir, mmap=False), False
+
+    store = MovieMetadataStore.from_dict(build_metadata(pd.read_csv(mapping_path), workers, chunk_size))
+
+    # Build beside the old store, move the old one aside and rename the new one
+    # in: readers never see a half-written store, and output_dir is missing
+    # only between the two renames. Stores already open keep their mmaps.
+    base = output_dir.rstrip(os.sep)
+    tmp_dir, old_dir = base + ".tmp", base + ".old"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    store.save(tmp_dir, source=source)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.isdir(output_dir):
+        os.rename(output_dir, old_dir)
+    os.rename(tmp_dir, output_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return store, True
+
+
+def load_compiled_metadata(saved_models_dir=SAVED_MODELS_DIR):
+    """
+    The store written by this stage, for the training scripts.
+    """
+    path = os.path.join(saved_models_dir, STORE_DIRNAME)
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"{path} not found; run Script/models/compile_metadata.py first")
+    return MovieMetadataStore.load(path, mmap=False)
+
+
+if __name__ == "__main__":
+    os.makedirs(SAVED_MODELS_DIR, exist_ok=True)
+    WORKERS = int(os.getenv("METADATA_WORKERS", "0")) or None
+    FORCE = os.getenv("METADATA_FORCE", "0") == "1"
+
+    store, compiled = compile_metadata(
+        os.path.join(DATA_DIR, "movie_mapping.csv"),
+        os.path.join(SAVED_MODELS_DIR, STORE_DIRNAME),
+        workers=WORKERS,
+        force=FORCE,
+    )
+    state = "compiled" if compiled else "already up to date"
+    print(f"SUCCESS: Movie metadata {state} ({len(store)} movies) in {SAVED_MODELS_DIR}")
@@ -1,10 +1,10 @@
 import os
-import pandas as pd
-import json
 import pickle
+from Script.data.load_data import load_ratings
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from Script.models.compile_metadata import load_compiled_metadata
+from Script.models.content_index import full_fit, incremental_update
+from Script.models.quantize import quantize, to_float
 from surprise import Dataset, Reader
 from surprise.model_selection import train_test_split
 
@@ -22,7 +22,6 @@ os.makedirs(SAVED_MODELS_DIR, exist_ok=True)
 
 # Define file paths
 df_path = os.getenv('DATA_PATH') or os.path.join(DATA_DIR, "sampled_data.csv")
-mapping_path = os.path.join(DATA_DIR, "movie_mapping.csv")
 
 print(f"DEBUG: Project Root: {PROJECT_ROOT}")
 print(f"DEBUG: Loading data from: {df_path}")
@@ -30,47 +29,51 @@ print(f"DEBUG: Loading data from: {df_path}")
 # -------------------------------
 # Load Datasets
 # -------------------------------
-ratings_df = pd.read_csv(df_path)
-mapping_df = pd.read_csv(mapping_path)
-
-mapping_df['genres'] = mapping_df['genres'].fillna("N/A")
-mapping_df['cast'] = mapping_df['cast'].fillna("[]")
-
-# Extract top 5 actors
-def extract_cast_names(cast_str, top_n=5):
-    try:
-        cast_list = json.loads(cast_str)
-        names = [c['name'] for c in cast_list]
-        return ', '.join(names[:top_n])
-    except Exception:
-        return ""
-
-mapping_df['cast_names'] = mapping_df['cast'].apply(extract_cast_names)
+ratings_df = load_ratings(df_path)
+# Parsed cast and normalized columns from compile_metadata.py
+movie_metadata = load_compiled_metadata(SAVED_MODELS_DIR)
 
 # Create combined feature string for TF-IDF
-mapping_df['features'] = mapping_df['genres'].str.replace('|', ' ', regex=False) + ' ' + mapping_df['cast_names']
-
-# Build movie metadata dictionary
-movie_metadata = {}
-for _, row in mapping_df.iterrows():
-    movie_metadata[int(row['movieId'])] = {
-        'title': row.get('title', 'Unknown'),
-        'genres': row['genres'],
-        'cast_names': row['cast_names']
-    }
+records = movie_metadata.gather(movie_metadata.movie_ids)
+features = [r['genres'].replace('|', ' ') + ' ' + r['cast_names'] for r in records]
 
 # -------------------------------
 # TF-IDF & Similarity Computation
 # -------------------------------
-tfidf = TfidfVectorizer(stop_words='english')
-tfidf_matrix = tfidf.fit_transform(mapping_df['features'])
-movie_ids = mapping_df['movieId'].values
-movie_index = {int(mid): idx for idx, mid in enumerate(movie_ids)}
-
-def compute_movie_similarity(matrix):
-    return cosine_similarity(matrix)
-
-similarity_matrix = compute_movie_similarity(tfidf_matrix)
+# CONTENT_INDEX_MODE=incremental reuses the previous run's vectorizer and only
+# recomputes similarities for new or changed movies; a full refit still runs
+# when vocabulary drift passes CONTENT_DRIFT_THRESHOLD.
+INDEX_MODE = os.getenv("CONTENT_INDEX_MODE", "full")
+DRIFT_THRESHOLD = float(os.getenv("CONTENT_DRIFT_THRESHOLD", "0.05"))
+# Storage precision of the saved similarity matrix: float64 | float32 | float16 | int8
+SIMILARITY_DTYPE = os.getenv("SIMILARITY_DTYPE", "float64")
+
+movie_ids = movie_metadata.movie_ids.astype(int)
+
+def load_previous_index():
+    names = ["content_tfidf_vectorizer.pkl", "content_tfidf_matrix.pkl", "hybrid_similarity_matrix.pkl",
+             "hybrid_movie_index_map.pkl", "content_features.pkl"]
+    paths = [os.path.join(SAVED_MODELS_DIR, n) for n in names]
+    if not all(os.path.exists(p) for p in paths):
+        return None
+    state = []
+    for path in paths:
+        with open(path, "rb") as f:
+            state.append(pickle.load(f))
+    return state
+
+previous = load_previous_index() if INDEX_MODE == "incremental" else None
+if previous is not None:
+    # A quantized matrix from the last run is updated at full precision
+    previous[2] = to_float(previous[2])
+    tfidf, tfidf_matrix, similarity_matrix, movie_index, feature_map, mode = incremental_update(
+        *previous, movie_ids, features, drift_threshold=DRIFT_THRESHOLD
+    )
+else:
+    tfidf, tfidf_matrix, similarity_matrix, movie_index, feature_map = full_fit(movie_ids, features)
+    mode = "full"
+
+print(f"DEBUG: Content index mode: {mode} ({len(movie_index)} movies)")
 
 # -------------------------------
 # Prediction Function (for Evaluation)
@@ -124,9 +127,11 @@ def save_pickle(obj, filename):
     with open(os.path.join(SAVED_MODELS_DIR, filename), "wb") as f:
         pickle.dump(obj, f)
 
-save_pickle(similarity_matrix, "hybrid_similarity_matrix.pkl")
+save_pickle(quantize(similarity_matrix, SIMILARITY_DTYPE), "hybrid_similarity_matrix.pkl")
 save_pickle(movie_index, "hybrid_movie_index_map.pkl")
-save_pickle(movie_metadata, "hybrid_movie_metadata.pkl")
+save_pickle(tfidf, "content_tfidf_vectorizer.pkl")
+save_pickle(tfidf_matrix, "content_tfidf_matrix.pkl")
+save_pickle(feature_map, "content_features.pkl")
 save_pickle(ratings_df, "content_ratings_df.pkl")
 
 print(f"SUCCESS: Content-based artifacts saved to {SAVED_MODELS_DIR}")
\ No newline at end of file
@@ -0,0 +1,121 @@
+import os
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from Script.models.quantize import save_matrix, load_matrix
+
+# Memory-mappable copy of the similarity matrix for serving processes
+SIMILARITY_DIRNAME = "similarity_matrix"
+
+# -------------------------------
+# Content Index (TF-IDF + Similarity)
+# -------------------------------
+# The index is the tuple of artifacts content_based.py persists:
+#   tfidf            fitted TfidfVectorizer
+#   tfidf_matrix     CSR matrix, one row per movie
+#   similarity       dense cosine similarity, rows/cols follow movie_index
+#   movie_index      {movieId: row}
+#   features         {movieId: feature string the row was built from}
+
+
+def full_fit(movie_ids, features):
+    """
+    Fit the vectorizer on the whole catalog and compute every pairwise similarity.
+    """
+    tfidf = TfidfVectorizer(stop_words='english')
+    tfidf_matrix = tfidf.fit_transform(features)
+    similarity = cosine_similarity(tfidf_matrix)
+    movie_index = {int(mid): idx for idx, mid in enumerate(movie_ids)}
+    feature_map = {int(mid): f for mid, f in zip(movie_ids, features)}
+    return tfidf, tfidf_matrix, similarity, movie_index, feature_map
+
+
+def vocabulary_drift(tfidf, docs):
+    """
+    Share of tokens in docs that the fitted vocabulary does not know.
+    """
+    analyzer = tfidf.build_analyzer()
+    vocab = tfidf.vocabulary_
+    total, unknown = 0, 0
+    for doc in docs:
+        tokens = analyzer(doc)
+        total += len(tokens)
+        unknown += sum(1 for t in tokens if t not in vocab)
+    return unknown / total if total else 0.0
+
+
+def incremental_update(tfidf, tfidf_matrix, similarity, movie_index, feature_map,
+                       movie_ids, features, drift_threshold=0.05):
+    """
+    Bring a previously fitted index up to date with the current catalog.
+
+    Only new or changed movies are vectorized (against the existing
+    vocabulary and IDF weights) and only their similarity rows/columns are
+    recomputed. Existing rows keep their position, new movies are appended.
+
+    Falls back to full_fit when movies were removed or when the unknown
+    token share of the changed documents exceeds drift_threshold.
+
+    Returns (tfidf, tfidf_matrix, similarity, movie_index, feature_map, mode)
+    where mode is one of 'unchanged', 'incremental' or 'full'.
+    """
+    movie_ids = [int(mid) for mid in movie_ids]
+    current = dict(zip(movie_ids, features))
+
+    if set(movie_index) - set(current):
+        return (*full_fit(movie_ids, features), "full")
+
+    changed = [mid for mid in movie_ids if feature_map.get(mid) != current[mid]]
+    if not changed:
+        return tfidf, tfidf_matrix, similarity, movie_index, feature_map, "unchanged"
+
+    changed_docs = [current[mid] for mid in changed]
+    if vocabulary_drift(tfidf, changed_docs) > drift_threshold:
+        return (*full_fit(movie_ids, features), "full")
+
+    n_old = tfidf_matrix.shape[0]
+    movie_index = dict(movie_index)
+    for mid in changed:
+        if mid not in movie_index:
+            movie_index[mid] = len(movie_index)
+    n_total = len(movie_index)
+    rows = np.array([movie_index[mid] for mid in changed])
+
+    # Stack the fresh vectors under the old matrix, then pick rows so that
+    # changed movies read their new vector and new movies land at the end.
+    new_vecs = tfidf.transform(changed_docs)
+    take = np.arange(n_total)
+    take[rows] = n_old + np.arange(len(changed))
+    tfidf_matrix = sp.vstack([tfidf_matrix, new_vecs]).tocsr()[take]
+
+    if n_total > n_old:
+        grown = np.zeros((n_total, n_total), dtype=similarity.dtype)
+        grown[:n_old, :n_old] = similarity
+        similarity = grown
+
+    sims = cosine_similarity(new_vecs, tfidf_matrix)
+    similarity[rows, :] = sims
+    similarity[:, rows] = sims.T
+
+    feature_map = dict(feature_map)
+    feature_map.update({mid: current[mid] for mid in changed})
+    return tfidf, tfidf_matrix, similarity, movie_index, feature_map, "incremental"
+
+
+def save_similarity(directory, similarity, movie_index):
+    """
+    Write the (possibly quantized) similarity matrix plus the movie id of
+    each row as .npy files.
+    """
+    save_matrix(directory, "matrix", similarity)
+    movie_ids = np.array(sorted(movie_index, key=movie_index.get), dtype=np.int64)
+    np.save(os.path.join(directory, "movie_ids.npy"), movie_ids)
+
+
+def load_similarity(directory, mmap=True):
+    """
+    (similarity, movie_ids) as written by save_similarity.
+    """
+    movie_ids = np.load(os.path.join(directory, "movie_ids.npy"))
+    return load_matrix(directory, "matrix", mmap=mmap), movie_ids
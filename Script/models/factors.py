@@ -0,0 +1,165 @@
+import os
+import json
+import numpy as np
+from Script.models.quantize import QuantizedMatrix, quantize, save_matrix, load_matrix
+
+FACTORS_VERSION = 1
+# Each trainer exports to its own directory, so retraining one never replaces
+# the other's factors; CF_FACTORS (svd | als) picks the directory the API serves.
+FACTORS_DIRNAMES = {"svd": "cf_factors_svd", "als": "cf_factors_als"}
+SERVED_FACTORS = os.getenv("CF_FACTORS", "svd")
+if SERVED_FACTORS not in FACTORS_DIRNAMES:
+    raise ValueError(f"CF_FACTORS must be one of {sorted(FACTORS_DIRNAMES)}, got '{SERVED_FACTORS}'")
+FACTORS_DIRNAME = FACTORS_DIRNAMES[SERVED_FACTORS]
+# Ratings each trainer fits on unless DATA_PATH names another file
+TRAINING_RATINGS = {"svd": "sampled_data.csv", "als": "ratings.csv"}
+
+ARRAY_FILES = ["user_ids", "item_ids", "bu", "bi"]
+# pu / qi may be stored quantized (see quantize.py)
+FACTOR_FILES = ["pu", "qi"]
+
+
+class CFFactors:
+    """
+    Plain-array form of a biased matrix factorization model:
+
+        est(u, i) = global_mean + bu[u] + bi[i] + pu[u] . qi[i]
+
+    clipped to rating_scale. user_ids / item_ids hold the raw ids of each
+    factor row. This is what the serving scorer consumes, whichever trainer
+    produced it. pu and qi are float arrays or int8 QuantizedMatrix.
+    """
+
+    def __init__(self, global_mean, rating_scale, user_ids, item_ids, bu, bi, pu, qi):
+        self.global_mean = float(global_mean)
+        self.rating_scale = (float(rating_scale[0]), float(rating_scale[1]))
+        self.user_ids = user_ids
+        self.item_ids = item_ids
+        self.bu = bu
+        self.bi = bi
+        self.pu = pu
+        self.qi = qi
+
+    @classmethod
+    def from_surprise(cls, model):
+        """
+        Extract the factors of a fitted surprise SVD model.
+        """
+        trainset = model.trainset
+        user_ids = np.array([int(trainset.to_raw_uid(u)) for u in range(trainset.n_users)], dtype=np.int64)
+        item_ids = np.array([int(trainset.to_raw_iid(i)) for i in range(trainset.n_items)], dtype=np.int64)
+        return cls(
+            trainset.global_mean, trainset.rating_scale,
+            user_ids, item_ids,
+            np.asarray(model.bu), np.asarray(model.bi),
+            np.asarray(model.pu), np.asarray(model.qi),
+        )
+
+    @property
+    def n_factors(self):
+        return self.pu.shape[1]
+
+    def quantized(self, dtype):
+        """
+        Copy with pu / qi stored as dtype ('float32', 'float16' or 'int8').
+        """
+        return CFFactors(
+            self.global_mean, self.rating_scale, self.user_ids, self.item_ids,
+            self.bu, self.bi, quantize(self.pu, dtype), quantize(self.qi, dtype),
+        )
+
+    def select_users(self, keep):
+        """
+        Copy holding only the user rows where the boolean mask keep is True;
+        item-side arrays are shared.
+        """
+        rows = np.flatnonzero(np.asarray(keep, dtype=bool))
+        pu = self.pu.take(rows) if isinstance(self.pu, QuantizedMatrix) else np.asarray(self.pu)[rows]
+        return CFFactors(
+            self.global_mean, self.rating_scale,
+            np.asarray(self.user_ids)[rows], self.item_ids,
+            np.asarray(self.bu)[rows], self.bi, pu, self.qi,
+        )
+
+    def predict(self, user_id, movie_id):
+        """
+        Single estimate with surprise's semantics for unknown users/items.
+        """
+        users = np.flatnonzero(self.user_ids == user_id)
+        items = np.flatnonzero(self.item_ids == movie_id)
+        est = self.global_mean
+        if len(users):
+            est += self.bu[users[0]]
+        if len(items):
+            est += self.bi[items[0]]
+        if len(users) and len(items):
+            est += float(np.dot(self.pu[users[0]], self.qi[items[0]]))
+        return float(np.clip(est, *self.rating_scale))
+
+    def predict_many(self, user_ids, movie_ids):
+        """
+        Vectorized predict() for parallel arrays of raw user and movie ids.
+        """
+        users = _positions(self.user_ids, user_ids)
+        items = _positions(self.item_ids, movie_ids)
+        est = np.full(len(users), self.global_mean)
+        known_u, known_i = users >= 0, items >= 0
+        est[known_u] += self.bu[users[known_u]]
+        est[known_i] += self.bi[items[known_i]]
+        both = known_u & known_i
+        if both.any():
+            est[both] += np.einsum("ij,ij->i", self.pu[users[both]], self.qi[items[both]])
+        return np.clip(est, *self.rating_scale)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(getattr(self, name)))
+        for name in FACTOR_FILES:
+            save_matrix(directory, name, getattr(self, name))
+        with open(os.path.join(directory, "factors.json"), "w") as f:
+            json.dump({
+                "version": FACTORS_VERSION,
+                "global_mean": self.global_mean,
+                "rating_scale": list(self.rating_scale),
+                "quantized": isinstance(self.pu, QuantizedMatrix),
+            }, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, "factors.json")) as f:
+            header = json.load(f)
+        if header.get("version") != FACTORS_VERSION:
+            raise ValueError(f"Unsupported factors version: {header.get('version')}")
+
+        mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+            for name in ARRAY_FILES
+        }
+        for name in FACTOR_FILES:
+            arrays[name] = load_matrix(directory, name, mmap=mmap)
+        return cls(header["global_mean"], header["rating_scale"], **arrays)
+
+
+def training_ratings_path(data_dir, trainer=SERVED_FACTORS):
+    """
+    Ratings file the trainer's factors are fitted on: DATA_PATH, else its
+    default under data_dir. The rating index (watched sets, history) must be
+    built from the same file so it covers the same users and movies.
+    """
+    return os.getenv("DATA_PATH") or os.path.join(data_dir, TRAINING_RATINGS[trainer])
+
+
+def _positions(ids, wanted):
+    """
+    Row of each wanted id in ids (which need not be sorted), -1 when absent.
+    """
+    ids = np.asarray(ids)
+    wanted = np.asarray(wanted)
+    if len(ids) == 0:
+        return np.full(len(wanted), -1, dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    pos = np.minimum(np.searchsorted(sorted_ids, wanted), len(ids) - 1)
+    return np.where(sorted_ids[pos] == wanted, order[pos], -1)
@@ -1,7 +1,11 @@
 import os
 import pickle
 import numpy as np
-import pandas as pd
+from Script.data.load_data import load_ratings
+from Script.models.factors import training_ratings_path
+from Script.models.compile_metadata import load_compiled_metadata
+from Script.models.rating_index import UserRatingIndex, INDEX_DIRNAME
+from Script.models.content_index import save_similarity, SIMILARITY_DIRNAME
 
 # -------------------------------
 # PATH LOGIC (Sync with Backend)
@@ -30,10 +34,8 @@ def load_pickle(name):
 # These names must match what content_based.py saves
 similarity_matrix = load_pickle("hybrid_similarity_matrix.pkl")
 movie_index_map = load_pickle("hybrid_movie_index_map.pkl")
-movie_metadata = load_pickle("hybrid_movie_metadata.pkl")
-
-# Ensure all metadata keys are ints
-movie_metadata = {int(k): v for k, v in movie_metadata.items()}
+# Written once by compile_metadata.py; the backend reads the same store
+movie_metadata = load_compiled_metadata(SAVED_MODELS_DIR)
 
 # -------------------------------
 # Load collaborative model
@@ -44,12 +46,17 @@ collaborative_model = load_pickle("trained_collaborative_model.pkl")
 # -------------------------------
 # Load ratings
 # -------------------------------
-ratings_df = pd.read_csv(os.path.join(DATA_DIR, "sampled_data.csv"))
+# The ratings the served factors (CF_FACTORS) were trained on, so the rating
+# index's watched sets and history match the factors' users and movies
+ratings_path = training_ratings_path(DATA_DIR)
+print(f"DEBUG: Loading ratings from: {ratings_path}")
+ratings_df = load_ratings(ratings_path)
 ratings_df["movieId"] = ratings_df["movieId"].astype(int)
 ratings_df["userId"] = ratings_df["userId"].astype(int)
 
 all_movie_ids = sorted(list(movie_metadata.keys()))
-movie_index_map = {m: i for i, m in enumerate(all_movie_ids)}
+# Keep content_based's movie_index_map: similarity rows follow its order, and
+# incremental index updates append new movies at the end rather than by id.
 
 # -------------------------------
 # Scoring Logic
@@ -107,9 +114,13 @@ def save_pickle(obj, name):
 
 save_pickle(similarity_matrix, "hybrid_similarity_matrix.pkl")
 save_pickle(movie_index_map, "hybrid_movie_index_map.pkl")
-save_pickle(movie_metadata, "hybrid_movie_metadata.pkl")
 save_pickle(collaborative_model, "trained_collaborative_model.pkl")
 
+# Per-user CSR ratings in similarity-matrix space for serving
+UserRatingIndex.build(ratings_df, movie_index_map).save(os.path.join(SAVED_MODELS_DIR, INDEX_DIRNAME))
+# .npy copy of the similarity matrix that scoring worker processes memory map
+save_similarity(os.path.join(SAVED_MODELS_DIR, SIMILARITY_DIRNAME), similarity_matrix, movie_index_map)
+
 print(f"SUCCESS: Hybrid assembly complete. All artifacts saved in {SAVED_MODELS_DIR}")
 
 if __name__ == "__main__":
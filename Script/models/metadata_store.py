@@ -0,0 +1,258 @@
+import os
+import re
+import json
+from collections.abc import Mapping
+import numpy as np
+
+STORE_VERSION = 2
+STORE_DIRNAME = "movie_metadata_store"
+
+ARRAY_FILES = [
+    "movie_ids",
+    "title_offsets", "title_blob",
+    "lower_title_offsets", "lower_title_blob",
+    "cast_offsets", "cast_blob",
+    "genre_offsets", "genre_codes",
+]
+
+
+# -------------------------------
+# Encoding Helpers
+# -------------------------------
+def _as_text(value, default):
+    if isinstance(value, str):
+        return value
+    return default
+
+
+def _pack_strings(strings):
+    """
+    Encode a list of strings into (offsets, blob) where string i is
+    blob[offsets[i]:offsets[i + 1]] decoded as UTF-8.
+    """
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+class MovieMetadataStore(Mapping):
+    """
+    Columnar, read-only replacement for the movie_metadata dict.
+
+    Movies are kept in a sorted int32 movieId array, titles and cast names
+    live in offset-indexed UTF-8 blobs and genres are stored as small
+    integer codes into a shared genre table. A lowercased copy of the title
+    blob serves case-insensitive search. Lookups by id are a binary
+    search, and every array can be memory mapped from disk so workers
+    share pages instead of each unpickling a dict of dicts.
+
+    Behaves like Mapping[int, dict] with the same keys as the old dict
+    ('title', 'genres', 'cast_names').
+    """
+
+    def __init__(self, movie_ids, title_offsets, title_blob, lower_title_offsets, lower_title_blob,
+                 cast_offsets, cast_blob, genre_offsets, genre_codes, genre_table):
+        self.movie_ids = movie_ids
+        self.title_offsets = title_offsets
+        self.title_blob = title_blob
+        self.lower_title_offsets = lower_title_offsets
+        self.lower_title_blob = lower_title_blob
+        self.cast_offsets = cast_offsets
+        self.cast_blob = cast_blob
+        self.genre_offsets = genre_offsets
+        self.genre_codes = genre_codes
+        self.genre_table = list(genre_table)
+
+    # -------------------------------
+    # Construction
+    # -------------------------------
+    @classmethod
+    def from_dict(cls, metadata):
+        """
+        Build a store from the legacy {movieId: {'title', 'genres', 'cast_names'}} dict.
+        """
+        ids = sorted(int(k) for k in metadata.keys())
+        titles, casts, genre_lists = [], [], []
+        genre_table, genre_lookup = [], {}
+
+        for mid in ids:
+            info = metadata.get(mid)
+            if info is None:
+                info = metadata.get(str(mid), {})
+            titles.append(_as_text(info.get("title"), "Unknown"))
+            casts.append(_as_text(info.get("cast_names"), "N/A"))
+
+            codes = []
+            for genre in _as_text(info.get("genres"), "N/A").split("|"):
+                if genre not in genre_lookup:
+                    genre_lookup[genre] = len(genre_table)
+                    genre_table.append(genre)
+                codes.append(genre_lookup[genre])
+            genre_lists.append(codes)
+
+        code_dtype = np.uint8 if len(genre_table) <= 256 else np.uint16
+        genre_offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        if genre_lists:
+            genre_offsets[1:] = np.cumsum([len(c) for c in genre_lists])
+        genre_codes = np.array([c for codes in genre_lists for c in codes], dtype=code_dtype)
+
+        title_offsets, title_blob = _pack_strings(titles)
+        # Lowercasing can change a title's UTF-8 length, so it has its own offsets
+        lower_title_offsets, lower_title_blob = _pack_strings([t.lower() for t in titles])
+        cast_offsets, cast_blob = _pack_strings(casts)
+
+        return cls(
+            np.array(ids, dtype=np.int32),
+            title_offsets, title_blob,
+            lower_title_offsets, lower_title_blob,
+            cast_offsets, cast_blob,
+            genre_offsets, genre_codes,
+            genre_table,
+        )
+
+    def save(self, directory, source=None):
+        """
+        Write the arrays plus store.json; source (e.g. a fingerprint of the
+        input files) is recorded in the header for read_header().
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(getattr(self, name)))
+        header = {"version": STORE_VERSION, "genre_table": self.genre_table}
+        if source is not None:
+            header["source"] = source
+        with open(os.path.join(directory, "store.json"), "w") as f:
+            json.dump(header, f)
+
+    @staticmethod
+    def read_header(directory):
+        """
+        store.json of a saved store, or None if there is none.
+        """
+        path = os.path.join(directory, "store.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Load a saved store. With mmap=True the arrays are memory mapped read-only.
+        """
+        with open(os.path.join(directory, "store.json")) as f:
+            header = json.load(f)
+        if header.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported metadata store version: {header.get('version')}")
+
+        mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+            for name in ARRAY_FILES
+        }
+        return cls(genre_table=header["genre_table"], **arrays)
+
+    # -------------------------------
+    # Lookup
+    # -------------------------------
+    def index_of(self, movie_id):
+        """
+        Position of movie_id in the sorted id array, or -1 if absent.
+        """
+        pos = int(np.searchsorted(self.movie_ids, movie_id))
+        if pos < len(self.movie_ids) and int(self.movie_ids[pos]) == movie_id:
+            return pos
+        return -1
+
+    def _text(self, offsets, blob, pos):
+        return bytes(blob[offsets[pos]:offsets[pos + 1]]).decode("utf-8")
+
+    def _record(self, pos):
+        codes = self.genre_codes[self.genre_offsets[pos]:self.genre_offsets[pos + 1]]
+        return {
+            "title": self._text(self.title_offsets, self.title_blob, pos),
+            "genres": "|".join(self.genre_table[c] for c in codes),
+            "cast_names": self._text(self.cast_offsets, self.cast_blob, pos),
+        }
+
+    def title(self, movie_id, default="Unknown"):
+        pos = self.index_of(movie_id)
+        if pos < 0:
+            return default
+        return self._text(self.title_offsets, self.title_blob, pos)
+
+    # -------------------------------
+    # Catalog Scans
+    # -------------------------------
+    def title_matches(self, query):
+        """
+        Ids of movies whose title contains query (case-insensitive), in id
+        order. Searches the lowercased title blob in place (no per-movie
+        strings); a hit is mapped to its movie through the offsets and kept
+        only if it does not run into the next title.
+        """
+        needle = query.lower().encode("utf-8")
+        if not needle:
+            return [int(mid) for mid in self.movie_ids]
+        offsets = self.lower_title_offsets
+        pattern = re.compile(re.escape(needle))
+        blob = memoryview(np.ascontiguousarray(self.lower_title_blob))
+        positions = []
+        hit = pattern.search(blob)
+        while hit:
+            pos = int(np.searchsorted(offsets, hit.start(), side="right")) - 1
+            end = int(offsets[pos + 1])
+            if hit.end() <= end:
+                positions.append(pos)
+                # One hit per movie: continue in the next title
+                hit = pattern.search(blob, end)
+            else:
+                hit = pattern.search(blob, hit.start() + 1)
+        return [int(mid) for mid in np.asarray(self.movie_ids)[positions]]
+
+    def genre_matches(self, genre):
+        """
+        Ids of movies with a genre containing `genre` (case-insensitive), in
+        id order; matched on the genre codes without building records.
+        """
+        genre = genre.lower()
+        codes = [code for code, name in enumerate(self.genre_table) if genre in name.lower()]
+        if not codes:
+            return []
+        owners = np.repeat(np.arange(len(self.movie_ids)), np.diff(self.genre_offsets))
+        positions = np.unique(owners[np.isin(self.genre_codes, codes)])
+        return [int(mid) for mid in np.asarray(self.movie_ids)[positions]]
+
+    def gather(self, movie_ids, default=None):
+        """
+        Bulk lookup: one vectorized binary search for the whole list of ids.
+        Missing ids map to `default`.
+        """
+        ids = np.asarray(movie_ids, dtype=np.int64)
+        if len(self.movie_ids) == 0:
+            return [default] * len(ids)
+        pos = np.searchsorted(self.movie_ids, ids)
+        pos_clipped = np.minimum(pos, len(self.movie_ids) - 1)
+        found = (pos < len(self.movie_ids)) & (self.movie_ids[pos_clipped] == ids)
+        return [self._record(int(p)) if ok else default for p, ok in zip(pos_clipped, found)]
+
+    def __getitem__(self, movie_id):
+        pos = self.index_of(int(movie_id))
+        if pos < 0:
+            raise KeyError(movie_id)
+        return self._record(pos)
+
+    def __contains__(self, movie_id):
+        try:
+            return self.index_of(int(movie_id)) >= 0
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        return (int(mid) for mid in self.movie_ids)
+
+    def __len__(self):
+        return len(self.movie_ids)
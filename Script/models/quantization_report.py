@@ -0,0 +1,112 @@
+import os
+import json
+import pickle
+import numpy as np
+from Script.models.factors import CFFactors, training_ratings_path
+from Script.data.load_data import load_ratings
+from Script.models.quantize import QuantizedMatrix, quantize, to_float
+from Script.models.rating_index import UserRatingIndex, INDEX_DIRNAME
+from Script.fastapi.scoring import HybridScorer
+
+# -------------------------------
+# PATH LOGIC
+# -------------------------------
+PROJECT_ROOT = os.getenv("GITHUB_WORKSPACE")
+if not PROJECT_ROOT:
+    PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "Data")
+SAVED_MODELS_DIR = os.path.join(PROJECT_ROOT, "Script", "saved_models")
+
+# -------------------------------
+# Settings
+# -------------------------------
+DTYPES = os.getenv("REPORT_DTYPES", "float16,int8").split(",")
+SAMPLE_USERS = int(os.getenv("REPORT_SAMPLE_USERS", "200"))
+SAMPLE_RATINGS = int(os.getenv("REPORT_SAMPLE_RATINGS", "200000"))
+TOP_N = int(os.getenv("REPORT_TOP_N", "10"))
+ALPHA = float(os.getenv("REPORT_ALPHA", "0.7"))
+
+def load_pickle(name):
+    with open(os.path.join(SAVED_MODELS_DIR, name), "rb") as f:
+        return pickle.load(f)
+
+def nbytes(array):
+    return int(array.nbytes)
+
+# -------------------------------
+# Full-precision reference
+# -------------------------------
+collaborative_model = load_pickle("trained_collaborative_model.pkl")
+saved_similarity = load_pickle("hybrid_similarity_matrix.pkl")
+movie_index_map = load_pickle("hybrid_movie_index_map.pkl")
+
+if isinstance(saved_similarity, QuantizedMatrix) or np.asarray(saved_similarity).dtype != np.float64:
+    print("WARNING: saved similarity matrix is already reduced precision; it is used as the reference.")
+similarity = to_float(saved_similarity)
+factors = CFFactors.from_surprise(collaborative_model)
+movie_ids = sorted(movie_index_map, key=movie_index_map.get)
+
+index_path = os.path.join(SAVED_MODELS_DIR, INDEX_DIRNAME)
+if os.path.isdir(index_path):
+    rating_index = UserRatingIndex.load(index_path)
+else:
+    rating_index = UserRatingIndex.build(load_ratings(training_ratings_path(DATA_DIR, "svd")), movie_index_map)
+
+reference = HybridScorer(factors, similarity, movie_ids, rating_index)
+
+rng = np.random.default_rng(42)
+users = rng.choice(np.asarray(rating_index.user_ids), size=min(SAMPLE_USERS, len(rating_index)), replace=False)
+
+# Training ratings (from the rating index) to measure the CF reconstruction error on
+entry_users = np.repeat(np.asarray(rating_index.user_ids), np.diff(rating_index.indptr))
+picked = rng.choice(len(entry_users), size=min(SAMPLE_RATINGS, len(entry_users)), replace=False)
+true_ratings = np.asarray(rating_index.ratings)[picked].astype(np.float64)
+entry_users, entry_movies = entry_users[picked], np.asarray(rating_index.movie_ids)[picked]
+
+def rmse(model):
+    return float(np.sqrt(np.mean((model.predict_many(entry_users, entry_movies) - true_ratings) ** 2)))
+
+def top_movies(scorer):
+    scores = scorer.recommend_scores(users, [ALPHA] * len(users))
+    return [{mid for mid, _ in scorer.top_n(uid, row, TOP_N)} for uid, row in zip(users, scores)]
+
+reference_top = top_movies(reference)
+reference_rmse = rmse(factors)
+
+report = {
+    "users": len(users),
+    "ratings": len(true_ratings),
+    "top_n": TOP_N,
+    "float64": {
+        "similarity_bytes": nbytes(similarity),
+        "factor_bytes": nbytes(factors.pu) + nbytes(factors.qi),
+        "rmse": round(reference_rmse, 5),
+    },
+}
+
+# -------------------------------
+# Quantized variants
+# -------------------------------
+for dtype in DTYPES:
+    q_similarity = quantize(similarity, dtype)
+    q_factors = factors.quantized(dtype)
+    q_top = top_movies(HybridScorer(q_factors, q_similarity, movie_ids, rating_index))
+
+    overlap = [len(a & b) / len(a) for a, b in zip(reference_top, q_top) if a]
+    q_rmse = rmse(q_factors)
+    report[dtype] = {
+        "similarity_bytes": nbytes(q_similarity),
+        "factor_bytes": nbytes(q_factors.pu) + nbytes(q_factors.qi),
+        "rmse": round(q_rmse, 5),
+        "rmse_change": round(q_rmse - reference_rmse, 6),
+        f"top{TOP_N}_overlap": round(float(np.mean(overlap)) if overlap else float("nan"), 4),
+    }
+    print(f"{dtype:>8}: top-{TOP_N} overlap {report[dtype][f'top{TOP_N}_overlap']:.4f}, "
+          f"RMSE change {report[dtype]['rmse_change']:+.6f}, "
+          f"similarity {report[dtype]['similarity_bytes'] / 1e6:.1f} MB")
+
+with open(os.path.join(SAVED_MODELS_DIR, "quantization_report.json"), "w") as f:
+    json.dump(report, f, indent=2)
+
+print(f"SUCCESS: Quantization report saved in {SAVED_MODELS_DIR}")
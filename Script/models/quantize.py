@@ -0,0 +1,124 @@
+import os
+import numpy as np
+
+DTYPES = ("float64", "float32", "float16", "int8")
+
+
+class QuantizedMatrix:
+    """
+    A 2-D array stored as int8 with one float32 scale per row:
+
+        value[i, j] ~= data[i, j] * scale[i]
+
+    Indexing dequantizes only the selected rows to float32, so scorers can
+    gather what they need without ever expanding the whole matrix.
+    """
+
+    def __init__(self, data, scale):
+        self.data = data
+        self.scale = scale
+
+    @classmethod
+    def from_array(cls, array):
+        array = np.asarray(array, dtype=np.float32)
+        peak = np.abs(array).max(axis=1) if array.size else np.zeros(len(array), dtype=np.float32)
+        scale = (peak / 127.0).astype(np.float32)
+        safe = np.where(scale > 0, scale, 1.0)[:, None]
+        data = np.clip(np.rint(array / safe), -127, 127).astype(np.int8)
+        return cls(data, scale)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.scale.nbytes
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        rows, cols = (key if isinstance(key, tuple) else (key, None))
+        values = self.data[rows].astype(np.float32)
+        scale = self.scale[rows]
+        values = values * (scale[..., None] if np.ndim(scale) else scale)
+        return values if cols is None else values[..., cols]
+
+    def block(self, rows, cols):
+        """
+        float32 values of the rows x cols sub-matrix, gathering only those cells.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return self.data[np.ix_(rows, np.asarray(cols, dtype=np.int64))].astype(np.float32) * self.scale[rows][:, None]
+
+    def dequantize(self):
+        return self[:]
+
+    def take(self, rows):
+        """
+        New matrix made of the given rows; -1 gives an all-zero row.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        missing = rows < 0
+        data = self.data[np.where(missing, 0, rows)]
+        scale = self.scale[np.where(missing, 0, rows)].copy()
+        scale[missing] = 0.0
+        return QuantizedMatrix(data, scale)
+
+    def save(self, directory, name):
+        np.save(os.path.join(directory, f"{name}.npy"), np.asarray(self.data))
+        np.save(os.path.join(directory, f"{name}_scale.npy"), np.asarray(self.scale))
+
+    @classmethod
+    def load(cls, directory, name, mmap=True):
+        mode = "r" if mmap else None
+        return cls(
+            np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode),
+            np.load(os.path.join(directory, f"{name}_scale.npy"), mmap_mode=mode),
+        )
+
+
+def quantize(array, dtype):
+    """
+    Store a float matrix as float64/float32/float16 or per-row-scaled int8.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype}', expected one of {DTYPES}")
+    if dtype == "int8":
+        return QuantizedMatrix.from_array(array)
+    return np.asarray(array, dtype=dtype)
+
+
+def to_float(array):
+    """
+    Full float view of a possibly quantized matrix (for training-time updates).
+    """
+    if isinstance(array, QuantizedMatrix):
+        return array.dequantize().astype(np.float64)
+    return np.asarray(array, dtype=np.float64)
+
+
+def save_matrix(directory, name, matrix):
+    """
+    Save a float or quantized matrix as .npy file(s) that load_matrix can memory map.
+    """
+    os.makedirs(directory, exist_ok=True)
+    if isinstance(matrix, QuantizedMatrix):
+        matrix.save(directory, name)
+    else:
+        np.save(os.path.join(directory, f"{name}.npy"), np.asarray(matrix))
+        # Drop the scale of an earlier int8 save so load_matrix sees a float matrix
+        stale_scale = os.path.join(directory, f"{name}_scale.npy")
+        if os.path.exists(stale_scale):
+            os.remove(stale_scale)
+
+
+def load_matrix(directory, name, mmap=True):
+    if os.path.exists(os.path.join(directory, f"{name}_scale.npy")):
+        return QuantizedMatrix.load(directory, name, mmap=mmap)
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
@@ -0,0 +1,155 @@
+import os
+import json
+import numpy as np
+
+INDEX_VERSION = 1
+INDEX_DIRNAME = "user_rating_index"
+
+ARRAY_FILES = ["user_ids", "indptr", "movie_ids", "item_idx", "ratings", "timestamps"]
+
+
+class UserRatingIndex:
+    """
+    Per-user ratings in CSR form for serving.
+
+    user_ids    sorted raw user ids; a user's dense id is its position here
+    indptr      user d owns entries indptr[d]:indptr[d + 1]
+    movie_ids   raw movie id of every entry (int32)
+    item_idx    similarity-matrix row of every entry, -1 if the movie has none
+    ratings     float32 ratings
+    timestamps  int64 unix seconds
+
+    Each user's entries are ordered newest first (ties by movie id), so a
+    user's history, watched mask or rating vector is a slice instead of a
+    walk over trainset.ur. All arrays can be memory mapped.
+    """
+
+    def __init__(self, user_ids, indptr, movie_ids, item_idx, ratings, timestamps):
+        self.user_ids = user_ids
+        self.indptr = indptr
+        self.movie_ids = movie_ids
+        self.item_idx = item_idx
+        self.ratings = ratings
+        self.timestamps = timestamps
+
+    @classmethod
+    def build(cls, ratings_df, movie_index_map):
+        """
+        Build from a userId/movieId/rating[/timestamp] frame; item_idx follows movie_index_map.
+        """
+        users = ratings_df["userId"].values.astype(np.int64)
+        movies = ratings_df["movieId"].values.astype(np.int64)
+        ratings = ratings_df["rating"].values.astype(np.float32)
+        if "timestamp" in ratings_df.columns:
+            stamps = ratings_df["timestamp"].values.astype(np.int64)
+        else:
+            stamps = np.zeros(len(users), dtype=np.int64)
+
+        order = np.lexsort((movies, -stamps, users))
+        users, movies, ratings, stamps = users[order], movies[order], ratings[order], stamps[order]
+        user_ids, counts = np.unique(users, return_counts=True)
+        indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(counts)
+
+        # Vectorized movieId -> similarity row lookup
+        known_ids = np.array(sorted(movie_index_map), dtype=np.int64)
+        known_rows = np.array([movie_index_map[m] for m in known_ids], dtype=np.int32)
+        item_idx = np.full(len(movies), -1, dtype=np.int32)
+        if len(known_ids):
+            pos = np.minimum(np.searchsorted(known_ids, movies), len(known_ids) - 1)
+            hit = known_ids[pos] == movies
+            item_idx[hit] = known_rows[pos[hit]]
+
+        return cls(user_ids, indptr, movies.astype(np.int32), item_idx, ratings, stamps)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(getattr(self, name)))
+        with open(os.path.join(directory, "index.json"), "w") as f:
+            json.dump({"version": INDEX_VERSION}, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, "index.json")) as f:
+            header = json.load(f)
+        if header.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported rating index version: {header.get('version')}")
+
+        mode = "r" if mmap else None
+        return cls(**{
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+            for name in ARRAY_FILES
+        })
+
+    def select_users(self, keep):
+        """
+        Index holding only the users where the boolean mask keep (one value per
+        user_ids entry) is True. Only the kept users' entries are read, so a
+        memory-mapped index is never copied whole.
+        """
+        keep = np.asarray(keep, dtype=bool)
+        starts = np.asarray(self.indptr[:-1])[keep]
+        counts = np.asarray(self.indptr[1:])[keep] - starts
+        indptr = np.zeros(len(starts) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(counts)
+        # Entry positions of the kept users' slices, in order
+        entries = np.repeat(starts - indptr[:-1], counts) + np.arange(indptr[-1])
+        return UserRatingIndex(
+            np.asarray(self.user_ids)[keep], indptr,
+            *(np.asarray(getattr(self, name))[entries] for name in ARRAY_FILES[2:]),
+        )
+
+    # -------------------------------
+    # Lookup
+    # -------------------------------
+    def dense_id(self, user_id):
+        """
+        Position of user_id in user_ids, or -1 if the user has no ratings.
+        """
+        pos = int(np.searchsorted(self.user_ids, user_id))
+        if pos < len(self.user_ids) and int(self.user_ids[pos]) == user_id:
+            return pos
+        return -1
+
+    def __contains__(self, user_id):
+        return self.dense_id(int(user_id)) >= 0
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def user_slice(self, user_id):
+        """
+        (movie_ids, item_idx, ratings, timestamps) of a user, newest first.
+        """
+        d = self.dense_id(int(user_id))
+        if d < 0:
+            s = slice(0, 0)
+        else:
+            s = slice(int(self.indptr[d]), int(self.indptr[d + 1]))
+        return self.movie_ids[s], self.item_idx[s], self.ratings[s], self.timestamps[s]
+
+    def rated(self, user_id):
+        """
+        (similarity rows, ratings) of the user's movies that have a similarity row.
+        """
+        _, item_idx, ratings, _ = self.user_slice(user_id)
+        known = item_idx >= 0
+        return item_idx[known].astype(np.int64), ratings[known].astype(np.float64)
+
+    def watched_mask(self, user_id, n_items):
+        mask = np.zeros(n_items, dtype=bool)
+        mask[self.rated(user_id)[0]] = True
+        return mask
+
+    def rating_vector(self, user_id, n_items):
+        vector = np.zeros(n_items, dtype=np.float32)
+        idx, ratings = self.rated(user_id)
+        vector[idx] = ratings
+        return vector
+
+    def item_counts(self, n_items):
+        """
+        Number of ratings per similarity row.
+        """
+        return np.bincount(self.item_idx[self.item_idx >= 0], minlength=n_items)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from Script.models.als import train_als, train_rmse, load_ratings_csr, _plan_blocks, _solve_block
+from Script.models.factors import CFFactors, training_ratings_path
+from Script.models.rating_index import UserRatingIndex
+from Script.data.load_data import load_ratings
+
+def make_ratings(n_users=60, n_items=40, seed=0):
+    rng = np.random.default_rng(seed)
+    P, Q = rng.normal(size=(n_users, 3)), rng.normal(size=(n_items, 3))
+    full = np.clip(3.0 + P @ Q.T * 0.5, 0.5, 5.0)
+    mask = rng.random((n_users, n_items)) < 0.5
+    R = sp.csr_matrix(np.where(mask, full, 0.0))
+    return R, np.arange(1, n_users + 1), np.arange(100, 100 + n_items)
+
+def test_als_fits_low_rank_ratings(tmp_path):
+    R, user_ids, item_ids = make_ratings()
+    factors = train_als(R, user_ids, item_ids, n_factors=3, n_epochs=8, reg=0.01, n_jobs=2,
+                        block_size=16, block_entries=200, checkpoint_dir=tmp_path)
+
+    rmse = train_rmse(R, factors.global_mean, factors.pu, factors.qi, factors.bu, factors.bi)
+    assert rmse < 0.3
+    assert factors.pu.shape == (60, 3) and factors.qi.shape == (40, 3)
+    assert (tmp_path / "latest.json").exists()
+
+def test_block_solve_matches_per_row_ridge():
+    R, _, _ = make_ratings(n_users=12, n_items=9)
+    rng = np.random.default_rng(1)
+    fixed, fixed_bias = rng.normal(size=(9, 3)), rng.normal(size=9)
+    blocks = _plan_blocks(R, block_size=4, block_entries=20)
+    assert sorted(np.concatenate(blocks)) == [r for r in range(12) if R.indptr[r + 1] > R.indptr[r]]
+
+    for rows in blocks:
+        factors, bias = _solve_block(R, fixed, fixed_bias, 3.0, 0.1, rows)
+        for row, f, b in zip(rows, factors, bias):
+            cols = R.indices[R.indptr[row]:R.indptr[row + 1]]
+            X = np.hstack([fixed[cols], np.ones((len(cols), 1))])
+            y = R.data[R.indptr[row]:R.indptr[row + 1]] - 3.0 - fixed_bias[cols]
+            w = np.linalg.solve(X.T @ X + 0.1 * len(cols) * np.eye(4), X.T @ y)
+            assert np.allclose(np.append(f, b), w)
+
+def test_als_resumes_from_checkpoint(tmp_path):
+    R, user_ids, item_ids = make_ratings()
+    train_als(R, user_ids, item_ids, n_factors=3, n_epochs=2, checkpoint_dir=tmp_path)
+    resumed = train_als(R, user_ids, item_ids, n_factors=3, n_epochs=2, checkpoint_dir=tmp_path, resume=True)
+    saved = CFFactors.load(tmp_path / "epoch_001")
+    assert np.allclose(resumed.qi, saved.qi)
+
+def test_rating_index_matches_trained_factors(tmp_path, monkeypatch):
+    assert training_ratings_path("Data", "svd") != training_ratings_path("Data", "als")
+    R, user_ids, item_ids = make_ratings(n_users=15, n_items=12)
+    coo = R.tocoo()
+    path = tmp_path / "ratings.csv"
+    pd.DataFrame({"userId": user_ids[coo.row], "movieId": item_ids[coo.col], "rating": coo.data}).to_csv(path, index=False)
+    monkeypatch.setenv("DATA_PATH", str(path))
+
+    # Both trainers and the index builder read the same file
+    assert training_ratings_path("Data", "svd") == training_ratings_path("Data", "als") == str(path)
+    factors = train_als(*load_ratings_csr(training_ratings_path("Data", "als")), n_factors=2, n_epochs=1)
+    index = UserRatingIndex.build(load_ratings(training_ratings_path("Data", "als")), {})
+
+    assert np.array_equal(index.user_ids, factors.user_ids)
+    assert np.array_equal(np.unique(index.movie_ids), factors.item_ids)
@@ -48,4 +48,44 @@ def test_admin_stats_authorized():
     with TestClient(app) as client:
         response = client.get("/admin/stats?username=admin")
         assert response.status_code == 200
-        assert "total_users" in response.json()
\ No newline at end of file
+        assert "total_users" in response.json()
+
+def test_user_history_pagination():
+    with TestClient(app) as client:
+        first = client.get("/user/history?user_id=1&limit=1&fields=movie_id,rating")
+        assert first.status_code == 200
+        page = first.json()
+        assert len(page) <= 1
+        if page:
+            assert set(page[0]) == {"movie_id", "rating"}
+        cursor = first.headers.get("X-Next-Cursor")
+        if cursor:
+            second = client.get(f"/user/history?user_id=1&limit=1&fields=movie_id,rating&cursor={cursor}")
+            assert second.status_code == 200
+            assert second.json()[0]["movie_id"] != page[0]["movie_id"]
+
+def test_user_history_without_limit_is_complete():
+    with TestClient(app) as client:
+        full = client.get("/user/history?user_id=1&fields=movie_id")
+        assert full.status_code == 200
+        assert "X-Next-Cursor" not in full.headers
+        exported = client.get("/user/history/export?user_id=1&fields=movie_id")
+        assert full.json() == exported.json()
+
+def test_user_history_rejects_unknown_fields():
+    with TestClient(app) as client:
+        response = client.get("/user/history?user_id=1&fields=movie_id,password")
+        assert response.status_code == 400
+
+def test_user_history_export_streams_json():
+    with TestClient(app) as client:
+        response = client.get("/user/history/export?user_id=1")
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+
+def test_admin_profiles_protection():
+    with TestClient(app) as client:
+        assert client.get("/admin/profiles").status_code == 403
+        assert client.get("/admin/profiles?username=admin").status_code == 200
+        assert client.get("/admin/profiles/..%2F..%2Fetc%2Fpasswd?username=admin").status_code == 404
+        assert client.get("/admin/profiles/00000000000000000000-deadbeef-recommend?username=admin").status_code == 404
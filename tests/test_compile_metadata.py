@@ -0,0 +1,36 @@
+import json
+import pandas as pd
+from Script.models.compile_metadata import build_metadata, compile_metadata, parse_cast, parse_cast_column
+
+def cast_json(*names):
+    return json.dumps([{"name": n, "character": "x"} for n in names])
+
+def test_parse_cast_keeps_top_names_and_tolerates_bad_rows():
+    assert parse_cast(cast_json("A", "B", "C", "D", "E", "F")) == "A, B, C, D, E"
+    assert parse_cast("not json") == ""
+    assert parse_cast("[]") == ""
+
+def test_parallel_chunks_match_serial_parse():
+    casts = [cast_json(f"Actor {i}", f"Actor {i + 1}") for i in range(50)] + ["{bad"]
+    assert parse_cast_column(casts, workers=3, chunk_size=7) == [parse_cast(c) for c in casts]
+
+def test_build_metadata_normalizes_columns():
+    raw = pd.DataFrame({" id": [3, 1], "Title": ["Up", None], "genre": ["Animation|Family", None],
+                        "cast": [cast_json("Ed Asner"), None]})
+    metadata = build_metadata(raw, workers=1)
+    assert metadata[3] == {"title": "Up", "genres": "Animation|Family", "cast_names": "Ed Asner"}
+    assert metadata[1]["genres"] == "N/A" and metadata[1]["cast_names"] == ""
+
+def test_compile_skips_unchanged_source(tmp_path):
+    mapping = tmp_path / "movie_mapping.csv"
+    pd.DataFrame({"movieId": [2, 1], "title": ["B", "A"], "genres": ["Drama", "Comedy"],
+                  "cast": [cast_json("X"), cast_json("Y")]}).to_csv(mapping, index=False)
+    out = str(tmp_path / "store")
+
+    store, compiled = compile_metadata(str(mapping), out, workers=1)
+    assert compiled and store[1]["cast_names"] == "Y" and list(store) == [1, 2]
+    assert compile_metadata(str(mapping), out, workers=1)[1] is False
+
+    mapping.write_text(mapping.read_text().replace("Drama", "Thriller"))
+    store, compiled = compile_metadata(str(mapping), out, workers=1)
+    assert compiled and store[2]["genres"] == "Thriller"
@@ -0,0 +1,32 @@
+import numpy as np
+from Script.models.content_index import full_fit, incremental_update
+
+IDS = [1, 2, 3]
+FEATURES = [
+    "Adventure Animation Comedy Tom Hanks",
+    "Comedy Romance Walter Matthau",
+    "Action Crime Thriller Al Pacino",
+]
+
+def test_incremental_appends_new_movie():
+    state = full_fit(IDS, FEATURES)
+    *updated, mode = incremental_update(*state, IDS + [4], FEATURES + ["Comedy Romance Tom Hanks"])
+    tfidf, tfidf_matrix, similarity, movie_index, feature_map = updated
+
+    assert mode == "incremental"
+    assert movie_index[4] == 3
+    assert similarity.shape == (4, 4)
+    assert tfidf_matrix.shape[0] == 4
+    assert np.allclose(similarity, similarity.T)
+    assert np.isclose(similarity[3, 3], 1.0)
+    assert similarity[3, movie_index[2]] > similarity[3, movie_index[3]]
+
+def test_unchanged_catalog_is_a_no_op():
+    state = full_fit(IDS, FEATURES)
+    *_, mode = incremental_update(*state, IDS, FEATURES)
+    assert mode == "unchanged"
+
+def test_vocabulary_drift_forces_full_refit():
+    state = full_fit(IDS, FEATURES)
+    *_, mode = incremental_update(*state, IDS + [4], FEATURES + ["Documentary Werner Herzog"])
+    assert mode == "full"
@@ -0,0 +1,56 @@
+import os
+import signal
+import pytest
+from Script.models.factors import FACTORS_DIRNAME
+from Script.models.rating_index import INDEX_DIRNAME
+from Script.models.content_index import save_similarity, SIMILARITY_DIRNAME
+from Script.fastapi.scoring import load_scorer
+from Script.fastapi.executor import ScoringExecutor, Overloaded
+from test_scoring import make_scorer
+
+def save_artifacts(scorer, model_dir):
+    scorer.factors.save(model_dir / FACTORS_DIRNAME)
+    scorer.rating_index.save(model_dir / INDEX_DIRNAME)
+    save_similarity(model_dir / SIMILARITY_DIRNAME, scorer.similarity,
+                    {int(mid): i for i, mid in enumerate(scorer.movie_ids)})
+
+def test_workers_match_in_process_scoring(tmp_path):
+    save_artifacts(make_scorer(), tmp_path)
+    scorer = load_scorer(str(tmp_path))
+    scores = scorer.recommend_scores([2], [0.7], 10)[0]
+
+    executor = ScoringExecutor(str(tmp_path), workers=1)
+    try:
+        assert executor.recommend(2, 5, 0.7, 10) == scorer.top_n(2, scores, 5)
+        assert executor.recommend_block([2, 999], 5, 0.7, 10) == [scorer.top_n(2, scores, 5), []]
+        assert executor.similar(105, 3) == scorer.similar(105, 3)
+        assert executor.similar(1, 3) is None
+    finally:
+        executor.shutdown()
+
+def test_full_queue_is_rejected(tmp_path):
+    save_artifacts(make_scorer(), tmp_path)
+    executor = ScoringExecutor(str(tmp_path), workers=1, max_pending=1)
+    try:
+        # Hold the only slot as if a request were still being scored
+        executor._slots.acquire()
+        with pytest.raises(Overloaded):
+            executor.similar(105, 3)
+        executor._slots.release()
+        assert len(executor.similar(105, 3)) == 3
+    finally:
+        executor.shutdown()
+
+def test_dead_worker_is_replaced(tmp_path):
+    save_artifacts(make_scorer(), tmp_path)
+    executor = ScoringExecutor(str(tmp_path), workers=1, timeout=30.0)
+    try:
+        expected = executor.similar(105, 3)
+        broken = executor._pool
+        for pid in list(broken._processes):
+            os.kill(pid, signal.SIGKILL)
+        assert executor.similar(105, 3) == expected
+        assert executor._pool is not broken
+        assert executor.similar(105, 3) == expected
+    finally:
+        executor.shutdown()
@@ -0,0 +1,39 @@
+from Script.models.metadata_store import MovieMetadataStore
+
+METADATA = {
+    3: {"title": "Grumpier Old Men (1995)", "genres": "Comedy|Romance", "cast_names": "Walter Matthau, Jack Lemmon"},
+    1: {"title": "Toy Story (1995)", "genres": "Adventure|Animation|Children|Comedy|Fantasy", "cast_names": "Tom Hanks, Tim Allen"},
+    2: {"title": "Amélie (2001)", "genres": "N/A", "cast_names": "N/A"},
+}
+
+def test_store_round_trip(tmp_path):
+    MovieMetadataStore.from_dict(METADATA).save(tmp_path / "store")
+    store = MovieMetadataStore.load(tmp_path / "store", mmap=True)
+
+    assert list(store) == [1, 2, 3]
+    assert len(store) == 3
+    for mid, info in METADATA.items():
+        assert store[mid] == info
+    assert 4 not in store
+    assert store.get(4, {}) == {}
+    assert store.title(2) == "Amélie (2001)"
+    assert store.title_matches("amélie") == [2]
+
+def test_store_gather():
+    store = MovieMetadataStore.from_dict(METADATA)
+    gathered = store.gather([3, 99, 1])
+    assert gathered[0] == METADATA[3]
+    assert gathered[1] is None
+    assert gathered[2] == METADATA[1]
+
+def test_store_catalog_scans():
+    store = MovieMetadataStore.from_dict(METADATA)
+    assert store.title_matches("(1995)") == [1, 3]
+    assert store.title_matches("AMÉLIE") == [2]
+    assert store.title_matches("old men") == [3]
+    # Matches never span two titles
+    assert store.title_matches(")grumpier") == []
+    assert store.title_matches("") == [1, 2, 3]
+    assert store.genre_matches("comedy") == [1, 3]
+    assert store.genre_matches("romance") == [3]
+    assert store.genre_matches("western") == []
@@ -0,0 +1,27 @@
+import cProfile
+from Script.fastapi.profiling import ProfileStore
+
+def profile_something():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    sum(i * i for i in range(1000))
+    profiler.disable()
+    return profiler
+
+def test_profile_store_is_a_bounded_ring_buffer(tmp_path):
+    store = ProfileStore(directory=str(tmp_path), max_files=3)
+    names = [store.save("/recommend", "user_id=1", 0.01, profile_something()) for _ in range(5)]
+
+    listed = [entry["name"] for entry in store.list()]
+    # Newest first, and the oldest are the ones evicted even within one second
+    assert listed == names[:1:-1]
+    assert len(list(tmp_path.glob("*.prof"))) == 3
+    assert store.file_path(listed[0], ".prof") is not None
+    assert store.file_path("../secrets", ".prof") is None
+    assert store.file_path("../../etc/passwd", ".json") is None
+    assert store.file_path(listed[0], ".py") is None
+
+def test_empty_profile_is_not_stored(tmp_path):
+    store = ProfileStore(directory=str(tmp_path), max_files=3)
+    assert store.save("/search", "", 0.0, cProfile.Profile()) is None
+    assert store.list() == []
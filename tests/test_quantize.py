@@ -0,0 +1,31 @@
+import numpy as np
+from Script.models.factors import CFFactors
+from Script.models.quantize import QuantizedMatrix, quantize
+
+def test_int8_rows_dequantize_within_one_step():
+    rng = np.random.default_rng(0)
+    array = rng.normal(size=(20, 8))
+    q = quantize(array, "int8")
+
+    assert q.data.dtype == np.int8 and q.nbytes < array.nbytes / 4
+    assert np.allclose(q[:], array, atol=np.abs(array).max() / 127)
+    assert np.allclose(q[3], q[:][3]) and np.allclose(q[2, [1, 4]], q[:][2, [1, 4]])
+
+    assert np.allclose(q.block([2, 0], [1, 4]), q[:][np.ix_([2, 0], [1, 4])])
+
+    taken = q.take([4, -1])
+    assert np.allclose(taken[0], q[4]) and not taken[1].any()
+
+def test_quantized_factors_round_trip(tmp_path):
+    rng = np.random.default_rng(1)
+    factors = CFFactors(3.5, (0.5, 5.0), np.array([5, 1, 9]), np.array([30, 10]),
+                        rng.normal(size=3), rng.normal(size=2),
+                        rng.normal(size=(3, 4)), rng.normal(size=(2, 4)))
+    for dtype in ("float16", "int8"):
+        factors.quantized(dtype).save(tmp_path / dtype)
+        loaded = CFFactors.load(tmp_path / dtype)
+        assert isinstance(loaded.pu, QuantizedMatrix) == (dtype == "int8")
+        assert np.allclose(loaded.predict_many([5, 9, 2], [10, 30, 10]),
+                           factors.predict_many([5, 9, 2], [10, 30, 10]), atol=0.05)
+
+    assert np.isclose(factors.predict_many([1], [30])[0], factors.predict(1, 30))
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from Script.models.rating_index import UserRatingIndex
+
+RATINGS = pd.DataFrame({
+    "userId": [7, 3, 7, 7, 3],
+    "movieId": [10, 20, 30, 99, 10],
+    "rating": [4.0, 2.5, 5.0, 3.0, 1.0],
+    "timestamp": [100, 300, 200, 200, 50],
+})
+MOVIE_INDEX_MAP = {10: 0, 20: 1, 30: 2}
+
+def test_user_slices_are_newest_first(tmp_path):
+    UserRatingIndex.build(RATINGS, MOVIE_INDEX_MAP).save(tmp_path / "index")
+    index = UserRatingIndex.load(tmp_path / "index", mmap=True)
+
+    movie_ids, item_idx, ratings, stamps = index.user_slice(7)
+    assert list(movie_ids) == [30, 99, 10]
+    assert list(item_idx) == [2, -1, 0]
+    assert list(stamps) == [200, 200, 100]
+    assert 3 in index and 5 not in index
+    assert len(index.user_slice(5)[0]) == 0
+
+def test_vectors_and_counts_use_similarity_space():
+    index = UserRatingIndex.build(RATINGS, MOVIE_INDEX_MAP)
+    assert list(index.watched_mask(7, 3)) == [True, False, True]
+    assert np.allclose(index.rating_vector(3, 3), [1.0, 2.5, 0.0])
+    assert list(index.item_counts(3)) == [2, 1, 1]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from Script.data.sample_ratings import read_chunks, reservoir_sample, user_sample, save_sample
+from Script.data.load_data import load_ratings
+from Script.models.als import load_ratings_csr
+
+def write_ratings(path, n_users=50, per_user=20):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "userId": np.repeat(np.arange(1, n_users + 1), per_user),
+        "movieId": rng.integers(1, 500, n_users * per_user),
+        "rating": rng.choice([0.5, 2.0, 3.5, 5.0], n_users * per_user),
+        "timestamp": np.arange(n_users * per_user) + 1_000_000,
+    })
+    df.to_csv(path, index=False)
+    return df
+
+def test_reservoir_sample_is_seeded_and_bounded(tmp_path):
+    path = tmp_path / "ratings.csv"
+    df = write_ratings(path)
+    first = reservoir_sample(read_chunks(path, chunk_size=97), 100, seed=7)
+    again = reservoir_sample(read_chunks(path, chunk_size=97), 100, seed=7)
+
+    assert len(first["userId"]) == 100
+    assert np.array_equal(first["timestamp"], again["timestamp"])
+    assert len(np.unique(first["timestamp"])) == 100
+    assert set(first["timestamp"]) <= set(df["timestamp"])
+
+def test_user_sample_keeps_whole_histories(tmp_path):
+    path = tmp_path / "ratings.csv"
+    write_ratings(path)
+    sample = user_sample(read_chunks(path, chunk_size=97), 0.3, seed=1)
+
+    users, counts = np.unique(sample["userId"], return_counts=True)
+    assert 0 < len(users) < 50
+    assert (counts == 20).all()
+
+def test_time_window_and_columnar_output(tmp_path):
+    path = tmp_path / "ratings.csv"
+    write_ratings(path)
+    sample = user_sample(read_chunks(path, start=1_000_100, end=1_000_200), 1.0)
+    assert sample["timestamp"].min() >= 1_000_100 and sample["timestamp"].max() < 1_000_200
+
+    save_sample(sample, str(tmp_path / "sample.npz"))
+    with np.load(tmp_path / "sample.npz") as saved:
+        assert saved["userId"].dtype == np.int32
+        assert len(saved["rating"]) == 100
+
+def test_npz_sample_loads_like_csv(tmp_path):
+    path = tmp_path / "ratings.csv"
+    write_ratings(path)
+    sample = user_sample(read_chunks(path), 0.5, seed=3)
+    save_sample(sample, str(tmp_path / "sample.npz"))
+    save_sample(sample, str(tmp_path / "sample.csv"))
+
+    from_npz = load_ratings(str(tmp_path / "sample.npz"))
+    from_csv = load_ratings(str(tmp_path / "sample.csv"))
+    assert list(from_npz.columns) == list(from_csv.columns)
+    assert np.array_equal(from_npz["userId"], from_csv["userId"])
+    assert np.allclose(from_npz["rating"], from_csv["rating"])
+
+    R, user_ids, item_ids = load_ratings_csr(str(tmp_path / "sample.npz"))
+    assert R.nnz == len(from_csv.drop_duplicates(["userId", "movieId"]))
+    assert np.array_equal(user_ids, np.unique(from_csv["userId"]))
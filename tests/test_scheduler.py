@@ -0,0 +1,75 @@
+import threading
+import pytest
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Script.fastapi.scheduler import MicroBatcher, SingleFlight
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        first = pool.submit(flight.do, "key", slow)
+        started.wait()
+        others = [pool.submit(flight.do, "key", slow) for _ in range(7)]
+        results = [first.result()] + [f.result() for f in others]
+
+    assert results == ["result"] * 8
+    assert len(calls) == 1
+
+def test_micro_batcher_groups_requests_into_blocks():
+    batches = []
+
+    def batch_fn(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, window_ms=50, max_batch=4)
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(batcher.submit, range(10)))
+
+    assert results == [i * 2 for i in range(10)]
+    assert sum(len(b) for b in batches) == 10
+    assert all(len(b) <= 4 for b in batches)
+    assert len(batches) < 10
+
+def test_micro_batcher_propagates_errors():
+    def batch_fn(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(batch_fn, window_ms=1)
+    with pytest.raises(ValueError):
+        batcher.submit(1)
+
+def test_micro_batcher_fails_items_without_a_result():
+    batcher = MicroBatcher(lambda items: items[:-1], window_ms=50, max_batch=4)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(batcher.submit, i) for i in range(4)]
+        errors = [f.exception(timeout=5) for f in futures]
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+def test_micro_batcher_leader_returns_after_its_own_batch():
+    release = threading.Event()
+
+    def batch_fn(items):
+        if 0 in items:
+            time.sleep(0.05)  # later requests queue up while the first batch runs
+        else:
+            release.wait(timeout=5)
+        return items
+
+    batcher = MicroBatcher(batch_fn, window_ms=1, max_batch=1)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(batcher.submit, 0)
+        time.sleep(0.01)
+        rest = [pool.submit(batcher.submit, i) for i in range(1, 4)]
+        assert first.result(timeout=1) == 0
+        release.set()
+        assert [f.result(timeout=5) for f in rest] == [1, 2, 3]
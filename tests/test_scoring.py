@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from Script.models.factors import CFFactors
+from Script.models.rating_index import UserRatingIndex
+from Script.fastapi.scoring import HybridScorer
+from Script.models.candidate_recall import candidate_recall
+
+def make_scorer(n_users=5, n_items=30, k=4, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = CFFactors(
+        3.5, (0.5, 5.0),
+        np.arange(1, n_users + 1), np.arange(100, 100 + n_items - 2),  # last two movies unknown to CF
+        rng.normal(0, 0.2, n_users), rng.normal(0, 0.2, n_items - 2),
+        rng.normal(0, 0.3, (n_users, k)), rng.normal(0, 0.3, (n_items - 2, k)),
+    )
+    features = rng.random((n_items, 6))
+    features /= np.linalg.norm(features, axis=1, keepdims=True)
+    similarity = features @ features.T
+    ratings = pd.DataFrame({
+        "userId": np.repeat(np.arange(1, n_users + 1), 6),
+        "movieId": np.concatenate([100 + rng.choice(n_items, 6, replace=False) for _ in range(n_users)]),
+        "rating": rng.choice([1.0, 3.0, 4.5, 5.0], 6 * n_users),
+    })
+    movie_index_map = {100 + i: i for i in range(n_items)}
+    rating_index = UserRatingIndex.build(ratings, movie_index_map)
+    return HybridScorer(factors, similarity, np.arange(100, 100 + n_items), rating_index)
+
+def naive_score(scorer, uid, row, alpha):
+    cf = scorer.factors.predict(uid, int(scorer.movie_ids[row]))
+    idx, values = scorer.rated(uid)
+    sims = scorer.similarity[row, idx]
+    cb = 0.5 + 4.5 * np.clip((sims * values).sum() / np.abs(sims).sum(), 0.0, 1.0)
+    return alpha * cf + (1 - alpha) * cb
+
+def test_block_scores_match_per_item_blend():
+    scorer = make_scorer()
+    block = scorer.score_block([1, 2, 3], [0.7, 0.7, 0.3])
+    for row, (uid, alpha) in enumerate([(1, 0.7), (2, 0.7), (3, 0.3)]):
+        expected = [naive_score(scorer, uid, i, alpha) for i in range(scorer.n_items)]
+        assert np.allclose(block[row], expected)
+
+def test_candidates_exclude_watched_and_respect_pool_size():
+    scorer = make_scorer()
+    pool = scorer.candidates(1, 10)
+    assert len(pool) == 10
+    assert not scorer.watched_mask(1)[pool].any()
+
+def test_full_pool_has_perfect_recall():
+    scorer = make_scorer()
+    assert candidate_recall(scorer, [1, 2, 3], n=5, pool_size=scorer.n_items - 6) == 1.0
+
+def test_low_precision_factors_score_in_float32():
+    scorer = make_scorer()
+    for dtype in ("float16", "int8"):
+        low = HybridScorer(scorer.factors.quantized(dtype), scorer.similarity, scorer.movie_ids, scorer.rating_index)
+        assert low.qi.dtype == np.float32
+        assert np.allclose(low.cf_block([1, 2]), scorer.cf_block([1, 2]), atol=0.05)
+        assert len(low.candidates(1, 10)) == 10
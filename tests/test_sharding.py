@@ -0,0 +1,97 @@
+import json
+import httpx
+import numpy as np
+from fastapi.testclient import TestClient
+from Script.fastapi.sharding import shard_of, shard_for, shard_user_state
+from Script.models.factors import CFFactors
+from Script.models.rating_index import UserRatingIndex
+from Script.fastapi.router import create_router
+from test_scoring import make_scorer
+
+SHARDS = ["http://shard0", "http://shard1", "http://shard2"]
+
+def test_shards_partition_users_and_are_stable():
+    users = np.arange(1, 2001)
+    owners = shard_of(users, 3)
+    assert set(owners) == {0, 1, 2}
+    assert all(shard_for(int(u), 3) == o for u, o in zip(users[:50], owners[:50]))
+    assert np.bincount(owners).min() > 500
+
+def test_shard_user_state_keeps_only_owned_users():
+    scorer = make_scorer(n_users=12)
+    parts = [shard_user_state(scorer.factors, scorer.rating_index, s, 3) for s in range(3)]
+
+    assert sorted(u for f, _ in parts for u in f.user_ids) == sorted(scorer.factors.user_ids)
+    for shard, (factors, index) in enumerate(parts):
+        assert (shard_of(factors.user_ids, 3) == shard).all()
+        for uid in index.user_ids:
+            assert np.array_equal(index.user_slice(uid)[0], scorer.rating_index.user_slice(uid)[0])
+            assert np.allclose(factors.predict(uid, 101), scorer.factors.predict(uid, 101))
+
+def test_shard_user_state_from_memory_mapped_artifacts(tmp_path):
+    scorer = make_scorer(n_users=12)
+    scorer.factors.save(tmp_path / "factors")
+    scorer.rating_index.save(tmp_path / "index")
+    factors, index = shard_user_state(
+        CFFactors.load(tmp_path / "factors", mmap=True),
+        UserRatingIndex.load(tmp_path / "index", mmap=True), 1, 3,
+    )
+    expected = scorer.rating_index.select_users(shard_of(scorer.rating_index.user_ids, 3) == 1)
+    assert not isinstance(index.ratings, np.memmap) and not isinstance(factors.bu, np.memmap)
+    assert np.array_equal(index.indptr, expected.indptr)
+    assert np.array_equal(index.movie_ids, expected.movie_ids)
+    assert np.array_equal(index.timestamps, expected.timestamps)
+
+def make_router(calls):
+    def handler(request):
+        shard = SHARDS.index(f"{request.url.scheme}://{request.url.host}")
+        calls.append((shard, request.url.path))
+        if request.url.path == "/recommend/batch":
+            body = json.loads(request.content)
+            assert all(shard_for(uid, 3) == shard for uid in body["user_ids"])
+            return httpx.Response(200, json={str(uid): [{"shard": shard}] for uid in body["user_ids"]})
+        return httpx.Response(200, json={"shard": shard}, headers={"X-Next-Cursor": "abc"})
+    return TestClient(create_router(SHARDS, transport=httpx.MockTransport(handler)))
+
+def test_user_requests_go_to_owning_shard():
+    calls = []
+    with make_router(calls) as client:
+        for uid in range(1, 20):
+            response = client.get(f"/user/history?user_id={uid}&limit=5")
+            assert response.json() == {"shard": shard_for(uid, 3)}
+            assert response.headers["X-Next-Cursor"] == "abc"
+
+def test_batch_is_split_and_merged():
+    calls = []
+    with make_router(calls) as client:
+        users = list(range(1, 30))
+        response = client.post("/recommend/batch", json={"user_ids": users, "n": 3})
+        assert response.status_code == 200
+        assert list(response.json()) == [str(u) for u in users]
+        assert all(v == [{"shard": shard_for(int(u), 3)}] for u, v in response.json().items())
+        assert sorted(shard for shard, _ in calls) == sorted(set(shard_of(users, 3)))
+
+def test_healthy_shards_report_ok():
+    def handler(request):
+        return httpx.Response(200, json={"status": "ok", "models_loaded": True})
+    with TestClient(create_router(SHARDS, transport=httpx.MockTransport(handler))) as client:
+        body = client.get("/health").json()
+        assert body["status"] == "ok" and body["models_loaded"] is True
+        assert [s["http_status"] for s in body["shards"]] == [200, 200, 200]
+
+def test_responses_are_streamed_through():
+    chunks = [b"user_id,movie_id\n", b"1,101\n", b"1,102\n"]
+    def handler(request):
+        return httpx.Response(200, stream=httpx.ByteStream(b"".join(chunks)), headers={"Content-Type": "text/csv"})
+    with TestClient(create_router(SHARDS, transport=httpx.MockTransport(handler))) as client:
+        response = client.get("/user/history/export?user_id=1")
+        assert response.status_code == 200
+        assert response.content == b"".join(chunks)
+        assert response.headers["content-type"].startswith("text/csv")
+
+def test_unreachable_shard_is_bad_gateway():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+    with TestClient(create_router(SHARDS, transport=httpx.MockTransport(handler))) as client:
+        assert client.get("/recommend?user_id=1").status_code == 502
+        assert client.get("/health").json()["status"] == "degraded"
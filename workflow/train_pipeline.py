@@ -5,26 +5,43 @@ import sys
 
 # Define root_dir once at the top
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Training scripts import shared helpers as Script.models.*
+SCRIPT_ENV = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get("PYTHONPATH")]))}
+
+@task(name="Metadata Compilation", retries=1)
+def run_metadata():
+    result = subprocess.run(
+        [sys.executable, "Script/models/compile_metadata.py"],
+        capture_output=True,
+        text=True,
+        cwd=ROOT_DIR,
+        env=SCRIPT_ENV
+    )
+    if result.returncode != 0:
+        raise Exception(f"Metadata compilation failed: {result.stderr}")
+    return "Movie metadata compiled."
 
 @task(name="Collaborative Training", retries=1)
-def run_collaborative():
+def run_collaborative(metadata_status):
     result = subprocess.run(
         [sys.executable, "Script/models/collaborative.py"], 
         capture_output=True, 
         text=True,
-        cwd=ROOT_DIR  # Consistent
+        cwd=ROOT_DIR,  # Consistent
+        env=SCRIPT_ENV
     )
     if result.returncode != 0:
         raise Exception(f"Collaborative training failed: {result.stderr}")
     return "Collaborative artifacts saved."
 
 @task(name="Content-Based Training", retries=1)
-def run_content():
+def run_content(metadata_status):
     result = subprocess.run(
         [sys.executable, "Script/models/content_based.py"], 
         capture_output=True, 
         text=True,
-        cwd=ROOT_DIR  # Add this!
+        cwd=ROOT_DIR,  # Add this!
+        env=SCRIPT_ENV
     )
     if result.returncode != 0:
         raise Exception(f"Content training failed: {result.stderr}")
@@ -36,7 +53,8 @@ def run_hybrid(collab_status, content_status):
         [sys.executable, "Script/models/hybrid.py"], 
         capture_output=True, 
         text=True,
-        cwd=ROOT_DIR  # Add this!
+        cwd=ROOT_DIR,  # Add this!
+        env=SCRIPT_ENV
     )
     if result.returncode != 0:
         raise Exception(f"Hybrid assembly failed: {result.stderr}")
@@ -44,8 +62,9 @@ def run_hybrid(collab_status, content_status):
 
 @flow(name="Movie Recommendation Training Pipeline")
 def training_pipeline():
-    collab = run_collaborative()
-    content = run_content()
+    metadata = run_metadata()
+    collab = run_collaborative(metadata)
+    content = run_content(metadata)
     run_hybrid(collab, content)
 
 if __name__ == "__main__":